@@ -0,0 +1,173 @@
+import os
+import gc
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBackend:
+    """Base class for model backends (diarization, ASR, title generation).
+
+    Backends are configured in settings.INFERENCE_BACKENDS and created with
+    get_backend(). Heavy work such as downloading and loading weights belongs
+    in load(), which the owning service calls once.
+    """
+
+    # Approximate resident memory of the loaded model, used by the memory budget
+    memory_mb = 0
+
+    def load(self):
+        """Load model weights. Called once before the first inference."""
+
+    def unload(self):
+        """Drop the loaded weights so their memory can be reclaimed; load() brings them back."""
+
+
+class FakeLatencyMixin:
+    """Deterministic stand-in latency for fake backends.
+
+    Each call sleeps for `latency` seconds plus `latency_per_second` for every
+    second of input, so the cost of the code around the models can be measured
+    without downloading or running them.
+    """
+
+    def __init__(self, latency=0.0, latency_per_second=0.0, load_latency=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = float(latency)
+        self.latency_per_second = float(latency_per_second)
+        self.load_latency = float(load_latency)
+
+    def load(self):
+        if self.load_latency:
+            time.sleep(self.load_latency)
+
+    def simulate(self, units=0.0):
+        delay = self.latency + self.latency_per_second * units
+        if delay > 0:
+            time.sleep(delay)
+
+
+def release_accelerator_memory():
+    """Collect garbage and return cached GPU memory, without importing torch if unused."""
+    gc.collect()
+    torch = sys.modules.get('torch')
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+class InferenceBusy(Exception):
+    """A call could not get a slot on a model within the queue limits."""
+
+
+class ModelGate:
+    """Bounds the number of concurrent calls into one loaded model.
+
+    Model objects (Whisper, BART, pyannote) are not safe to call from several
+    threads at once, so each backend gets `concurrency` slots. Callers beyond
+    that queue for up to `timeout` seconds; when `max_waiting` callers are
+    already queued, new ones are turned away at once (0 = no limit).
+    """
+
+    def __init__(self, name, concurrency=1, timeout=None, max_waiting=0):
+        self.name = name
+        self.concurrency = max(1, int(concurrency))
+        self.timeout = timeout
+        self.max_waiting = max_waiting
+        self._semaphore = threading.BoundedSemaphore(self.concurrency)
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.active = 0
+        metrics.INFERENCE_SLOTS.set(self.concurrency, model=name)
+        metrics.INFERENCE_WAITING.set(0, model=name)
+        metrics.INFERENCE_ACTIVE.set(0, model=name)
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the model's slots for the duration of the block."""
+        with self._lock:
+            if self.max_waiting and self.waiting >= self.max_waiting:
+                metrics.INFERENCE_REJECTED.inc(model=self.name, reason='queue_full')
+                raise InferenceBusy(f"{self.waiting} calls already queued for the {self.name} model")
+            self.waiting += 1
+            metrics.INFERENCE_WAITING.set(self.waiting, model=self.name)
+
+        wait_start = time.perf_counter()
+        try:
+            acquired = self._semaphore.acquire(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+                metrics.INFERENCE_WAITING.set(self.waiting, model=self.name)
+        waited = time.perf_counter() - wait_start
+        metrics.INFERENCE_QUEUE_SECONDS.observe(waited, model=self.name)
+        if not acquired:
+            metrics.INFERENCE_REJECTED.inc(model=self.name, reason='timeout')
+            raise InferenceBusy(f"Timed out after {self.timeout}s waiting for the {self.name} model")
+
+        with self._lock:
+            self.active += 1
+            metrics.INFERENCE_ACTIVE.set(self.active, model=self.name)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+                metrics.INFERENCE_ACTIVE.set(self.active, model=self.name)
+            self._semaphore.release()
+
+
+_gates = {}
+_gates_lock = threading.Lock()
+
+
+def model_gate(name):
+    """Return the shared ModelGate for backend `name`, creating it on first use.
+
+    Concurrency comes from the backend's CONCURRENCY entry in
+    settings.INFERENCE_BACKENDS, defaulting to settings.INFERENCE_CONCURRENCY.
+    """
+    with _gates_lock:
+        gate = _gates.get(name)
+        if gate is None:
+            config = settings.INFERENCE_BACKENDS.get(name, {})
+            gate = ModelGate(
+                name,
+                concurrency=config.get('CONCURRENCY', settings.INFERENCE_CONCURRENCY),
+                timeout=settings.INFERENCE_QUEUE_TIMEOUT or None,
+                max_waiting=settings.INFERENCE_MAX_WAITING
+            )
+            _gates[name] = gate
+        return gate
+
+
+def get_backend(name):
+    """Instantiate the backend configured for `name` in settings.INFERENCE_BACKENDS."""
+    try:
+        config = settings.INFERENCE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"No inference backend configured for '{name}'")
+
+    backend_class = import_string(config['BACKEND'])
+    logger.info(f"Using {config['BACKEND']} for {name}")
+    return backend_class(**config.get('OPTIONS', {}))
+
+
+def get_model_cache_dir():
+    """Create the shared model cache directory and point Hugging Face at it."""
+    cache_dir = os.path.join(settings.BASE_DIR, 'model_cache')
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Configure Hugging Face cache paths
+    os.environ['HF_HOME'] = cache_dir
+    os.environ['TRANSFORMERS_CACHE'] = os.path.join(cache_dir, 'transformers')
+    os.environ['HF_DATASETS_CACHE'] = os.path.join(cache_dir, 'datasets')
+    return cache_dir
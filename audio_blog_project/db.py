@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Tune every new SQLite connection for concurrent readers and writers.
+
+    WAL lets readers proceed while a write is in progress, and NORMAL
+    synchronous mode is durable across application crashes in WAL mode while
+    avoiding an fsync per commit. The busy timeout itself is set through
+    DATABASES OPTIONS 'timeout'.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
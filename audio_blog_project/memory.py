@@ -0,0 +1,209 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+import psutil
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class MemoryBudgetExceeded(Exception):
+    """A job could not be started, or had to be stopped, to stay within the memory budget."""
+
+
+class Reservation:
+    """Memory set aside for one running job."""
+
+    def __init__(self, label, estimate_bytes):
+        self.label = label
+        self.estimate_bytes = estimate_bytes
+        self.exceeded = False
+
+    def check(self):
+        """Raise MemoryBudgetExceeded if the monitor flagged this job. Call between stages."""
+        if self.exceeded:
+            raise MemoryBudgetExceeded(
+                f"{self.label} was stopped because process memory exceeded the budget"
+            )
+
+
+class MemoryBudget:
+    """Admission control for inference jobs based on projected process RSS.
+
+    A job starts only when the current RSS (or the idle baseline plus the
+    estimates of already running jobs, whichever is larger) plus its own
+    estimate fits in settings.MEMORY_BUDGET_MB. Otherwise it waits for running
+    jobs to finish. While jobs run, a sampler thread watches the live RSS; if
+    it goes over budget the largest running job is flagged and stops at its
+    next check() instead of the process being OOM-killed.
+
+    Before a job is made to wait, the registered pressure handlers get a chance
+    to free memory, e.g. by unloading idle models.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._reservations = []
+        self._process = psutil.Process()
+        self._baseline = self.rss()
+        self._monitor = None
+        self._pressure_handlers = []
+        self._local = threading.local()
+
+    def add_pressure_handler(self, handler):
+        """Register handler(needed_bytes) -> freed_bytes, called when a job does not fit."""
+        self._pressure_handlers.append(handler)
+
+    def _relieve(self, needed_bytes):
+        freed = 0
+        for handler in self._pressure_handlers:
+            try:
+                freed += handler(needed_bytes - freed)
+            except Exception as e:
+                logger.error(f"Error freeing memory: {str(e)}")
+            if freed >= needed_bytes:
+                break
+        return freed
+
+    def rss(self):
+        """Resident memory of this process and its worker processes."""
+        total = self._process.memory_info().rss
+        for child in self._process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                # The worker exited between listing and reading it
+                continue
+        return total
+
+    @property
+    def limit_bytes(self):
+        if settings.MEMORY_BUDGET_MB:
+            return settings.MEMORY_BUDGET_MB * MB
+        return int(psutil.virtual_memory().total * 0.8)
+
+    def reserved_bytes(self):
+        with self._condition:
+            return sum(r.estimate_bytes for r in self._reservations)
+
+    def _projected(self, estimate_bytes):
+        reserved = sum(r.estimate_bytes for r in self._reservations)
+        return max(self.rss(), self._baseline + reserved) + estimate_bytes
+
+    def acquire(self, label, estimate_bytes, timeout=None):
+        """Block until the job fits in the budget and return its Reservation."""
+        timeout = settings.MEMORY_WAIT_TIMEOUT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        limit = self.limit_bytes
+
+        with self._condition:
+            while True:
+                if not self._reservations:
+                    self._baseline = self.rss()
+
+                projected = self._projected(estimate_bytes)
+                if projected <= limit:
+                    break
+
+                if self._relieve(projected - limit):
+                    # Measure again now that something was unloaded
+                    continue
+
+                if not self._reservations:
+                    # Nothing to wait for, the job alone does not fit
+                    raise MemoryBudgetExceeded(
+                        f"{label} needs about {estimate_bytes / MB:.0f}MB, projected RSS "
+                        f"{projected / MB:.0f}MB exceeds the {limit / MB:.0f}MB memory budget"
+                    )
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise MemoryBudgetExceeded(
+                        f"{label} timed out after {timeout}s waiting for memory "
+                        f"(projected {projected / MB:.0f}MB, budget {limit / MB:.0f}MB)"
+                    )
+                logger.info(f"{label} waiting for memory: projected {projected / MB:.0f}MB > {limit / MB:.0f}MB")
+                self._condition.wait(min(remaining, settings.MEMORY_SAMPLE_INTERVAL * 4))
+
+            reservation = Reservation(label, estimate_bytes)
+            self._reservations.append(reservation)
+            metrics.MEMORY_RESERVED_BYTES.set(sum(r.estimate_bytes for r in self._reservations))
+            self._ensure_monitor()
+
+        logger.info(f"{label} admitted with ~{estimate_bytes / MB:.0f}MB reserved")
+        return reservation
+
+    def release(self, reservation):
+        with self._condition:
+            if reservation in self._reservations:
+                self._reservations.remove(reservation)
+            metrics.MEMORY_RESERVED_BYTES.set(sum(r.estimate_bytes for r in self._reservations))
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, label, estimate_bytes, timeout=None):
+        """Hold a reservation for the duration of the block.
+
+        Nested in a thread that already holds one (e.g. a model loaded in the
+        middle of a job), this does not wait: the thread would be waiting on
+        memory it holds itself. The estimate is added to the outer reservation
+        for the duration instead.
+        """
+        outer = getattr(self._local, 'reservation', None)
+        if outer is not None:
+            self._resize(outer, estimate_bytes)
+            try:
+                yield outer
+            finally:
+                self._resize(outer, -estimate_bytes)
+            return
+
+        reservation = self.acquire(label, estimate_bytes, timeout=timeout)
+        self._local.reservation = reservation
+        try:
+            yield reservation
+        finally:
+            self._local.reservation = None
+            self.release(reservation)
+
+    def _resize(self, reservation, delta_bytes):
+        with self._condition:
+            reservation.estimate_bytes += delta_bytes
+            metrics.MEMORY_RESERVED_BYTES.set(sum(r.estimate_bytes for r in self._reservations))
+            if delta_bytes < 0:
+                self._condition.notify_all()
+
+    def _ensure_monitor(self):
+        if self._monitor is None or not self._monitor.is_alive():
+            self._monitor = threading.Thread(target=self._sample, name='memory-monitor', daemon=True)
+            self._monitor.start()
+
+    def _sample(self):
+        """Sample RSS while jobs are running and flag the largest job when over budget."""
+        while True:
+            with self._condition:
+                if not self._reservations:
+                    self._monitor = None
+                    return
+                rss = self.rss()
+                limit = self.limit_bytes
+                running = [r for r in self._reservations if not r.exceeded]
+                stopping = len(running) < len(self._reservations)
+                # Give a flagged job time to unwind before picking another one
+                if rss > limit and running and not stopping:
+                    victim = max(running, key=lambda r: r.estimate_bytes)
+                    victim.exceeded = True
+                    logger.warning(
+                        f"RSS {rss / MB:.0f}MB over the {limit / MB:.0f}MB budget, stopping {victim.label}"
+                    )
+            time.sleep(settings.MEMORY_SAMPLE_INTERVAL)
+
+
+memory_budget = MemoryBudget()
+metrics.PROCESS_RSS_BYTES.set_function(memory_budget.rss)
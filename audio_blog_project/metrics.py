@@ -0,0 +1,260 @@
+import time
+import threading
+import logging
+from contextlib import contextmanager
+
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Metric:
+    """Base class for in-process metrics rendered in the Prometheus text format.
+
+    Values live in this process only; with several server processes each one
+    exposes its own numbers.
+    """
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        with self._lock:
+            lines.extend(self._render_samples())
+        return lines
+
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_samples(self):
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(Metric):
+    type_name = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self._function = function
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function):
+        """Compute the (unlabelled) value at scrape time instead of storing it."""
+        self._function = function
+
+    def _render_samples(self):
+        if self._function is not None:
+            try:
+                return [f"{self.name} {_format_value(self._function())}"]
+            except Exception as e:
+                logger.error(f"Error collecting gauge {self.name}: {str(e)}")
+                return []
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def _render_samples(self):
+        lines = []
+        for key, (counts, total) in self._values.items():
+            for bound, count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+REGISTRY = []
+
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def timed(timings, stage):
+    """Add the wall-clock time of the block to timings[stage]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def metrics_view(request):
+    """Expose all registered metrics in the Prometheus text format."""
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# Metrics shared by the transcription and blog apps
+
+TRANSCRIPTION_STAGE_SECONDS = Histogram(
+    'transcription_stage_seconds',
+    'Time spent in each transcription stage',
+    labelnames=('stage',)
+)
+TRANSCRIPTION_AUDIO_SECONDS = Histogram(
+    'transcription_audio_seconds',
+    'Duration of transcribed audio',
+    buckets=(5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200)
+)
+TRANSCRIPTION_REAL_TIME_FACTOR = Histogram(
+    'transcription_real_time_factor',
+    'Processing time divided by audio duration',
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 5)
+)
+TRANSCRIPTION_JOBS = Counter(
+    'transcription_jobs',
+    'Finished transcription jobs by final status',
+    labelnames=('status',)
+)
+TRANSCRIPTION_QUEUE_DEPTH = Gauge(
+    'transcription_queue_depth',
+    'Transcriptions waiting in the background queue'
+)
+TRANSCRIPTION_IN_FLIGHT = Gauge(
+    'transcription_jobs_in_flight',
+    'Transcriptions currently being processed'
+)
+TRANSCRIPTION_QUEUE_DEPTH.set(0)
+TRANSCRIPTION_IN_FLIGHT.set(0)
+ASR_CASCADE_TURNS = Counter(
+    'asr_cascade_turns',
+    'Turns transcribed in cascade mode, by the model whose result was kept',
+    labelnames=('decoded_by',)
+)
+MODEL_LOAD_SECONDS = Histogram(
+    'model_load_seconds',
+    'Time to load a model backend',
+    labelnames=('model',),
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+)
+MODEL_RESIDENT = Gauge(
+    'model_resident',
+    'Whether a model backend is currently loaded (1) or unloaded (0)',
+    labelnames=('model',)
+)
+MODEL_UNLOADS = Counter(
+    'model_unloads',
+    'Models unloaded, by reason (idle, memory_pressure, shutdown, replaced)',
+    labelnames=('model', 'reason')
+)
+INFERENCE_SLOTS = Gauge(
+    'inference_slots',
+    'Concurrent calls allowed into each model',
+    labelnames=('model',)
+)
+INFERENCE_ACTIVE = Gauge(
+    'inference_active_calls',
+    'Calls currently running in each model',
+    labelnames=('model',)
+)
+INFERENCE_WAITING = Gauge(
+    'inference_waiting_calls',
+    'Calls queued for a free slot on each model',
+    labelnames=('model',)
+)
+INFERENCE_QUEUE_SECONDS = Histogram(
+    'inference_queue_seconds',
+    'Time a call waited for a free slot on a model',
+    labelnames=('model',),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+)
+INFERENCE_REJECTED = Counter(
+    'inference_rejected_calls',
+    'Calls turned away because a model queue was full or the wait timed out',
+    labelnames=('model', 'reason')
+)
+TITLE_GENERATION_SECONDS = Histogram(
+    'title_generation_seconds',
+    'Latency of title generation requests',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+PROCESS_RSS_BYTES = Gauge(
+    'process_resident_memory_bytes',
+    'Resident set size of this server process and its worker processes'
+)
+MEMORY_RESERVED_BYTES = Gauge(
+    'inference_memory_reserved_bytes',
+    'Memory reserved by running inference jobs'
+)
+MEMORY_RESERVED_BYTES.set(0)
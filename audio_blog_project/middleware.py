@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # Optional, gzip is used on its own without it
+    brotli = None
+
+
+def accepted_encodings(header):
+    """Content codings listed in an Accept-Encoding header, leaving out those with q=0."""
+    encodings = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            encodings.add(coding.strip().lower())
+    return encodings
+
+
+def compress_brotli_sequence(sequence, quality):
+    """Compress a streamed response chunk by chunk, flushing after each one."""
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Compress responses with brotli when the client accepts it, gzip otherwise.
+
+    Brotli needs the optional `brotli` package; without it this behaves like
+    Django's GZipMiddleware. Like gzip, strong ETags are made weak.
+    """
+
+    def process_response(self, request, response):
+        encodings = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is None or 'br' not in encodings or (response.streaming and response.is_async):
+            return super().process_response(request, response)
+
+        # It's not worth attempting to compress really short responses.
+        if not response.streaming and len(response.content) < 200:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        quality = settings.BROTLI_QUALITY
+        if response.streaming:
+            response.streaming_content = compress_brotli_sequence(response.streaming_content, quality)
+            # The compressed size is unknown until the stream ends
+            del response.headers['Content-Length']
+        else:
+            compressed_content = brotli.compress(response.content, quality=quality)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
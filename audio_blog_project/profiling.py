@@ -0,0 +1,109 @@
+import io
+import os
+import pstats
+import logging
+import cProfile
+import tempfile
+import zipfile
+from contextlib import contextmanager
+
+from django.core.files.base import ContentFile
+from rest_framework.exceptions import PermissionDenied
+
+logger = logging.getLogger(__name__)
+
+
+class JobProfiler:
+    """Runs cProfile, and the torch profiler when torch is installed, around one job.
+
+    The results are packed into a zip archive:
+        cprofile.prof      raw stats, open with pstats or snakeviz
+        cprofile.txt       top functions by cumulative time
+        torch_trace.json   Chrome trace, open in chrome://tracing or Perfetto
+        torch_ops.txt      top torch operators by self CPU time
+    """
+
+    def __init__(self):
+        self.cprofile = cProfile.Profile()
+        self.torch_profiler = None
+
+    def start(self):
+        try:
+            import torch
+            activities = [torch.profiler.ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(torch.profiler.ProfilerActivity.CUDA)
+            self.torch_profiler = torch.profiler.profile(activities=activities)
+            self.torch_profiler.__enter__()
+        except Exception as e:
+            logger.warning(f"Torch profiler unavailable, using cProfile only: {str(e)}")
+            self.torch_profiler = None
+        self.cprofile.enable()
+
+    def stop(self):
+        self.cprofile.disable()
+        if self.torch_profiler is not None:
+            self.torch_profiler.__exit__(None, None, None)
+
+    def archive(self):
+        """Return the profile artifacts as zip bytes."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive, \
+                tempfile.TemporaryDirectory() as temp_dir:
+            stats_path = os.path.join(temp_dir, 'cprofile.prof')
+            self.cprofile.dump_stats(stats_path)
+            archive.write(stats_path, 'cprofile.prof')
+
+            text = io.StringIO()
+            pstats.Stats(self.cprofile, stream=text).sort_stats('cumulative').print_stats(50)
+            archive.writestr('cprofile.txt', text.getvalue())
+
+            if self.torch_profiler is not None:
+                trace_path = os.path.join(temp_dir, 'torch_trace.json')
+                self.torch_profiler.export_chrome_trace(trace_path)
+                archive.write(trace_path, 'torch_trace.json')
+                archive.writestr(
+                    'torch_ops.txt',
+                    self.torch_profiler.key_averages().table(sort_by='self_cpu_time_total', row_limit=50)
+                )
+        return buffer.getvalue()
+
+
+@contextmanager
+def profiled(model, pk, enabled):
+    """Profile the block and attach the artifacts to model instance `pk`.
+
+    When `enabled` is false this does nothing, so unprofiled jobs pay no cost.
+    The model needs a `profile_artifact` FileField.
+    """
+    if not enabled:
+        yield
+        return
+
+    profiler = JobProfiler()
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        try:
+            instance = model(pk=pk)
+            name = f"{model._meta.model_name}_{pk}.zip"
+            instance.profile_artifact.save(name, ContentFile(profiler.archive()), save=False)
+            model.objects.filter(pk=pk).update(profile_artifact=instance.profile_artifact.name)
+            logger.info(f"Saved profile for {model._meta.model_name} {pk} to {instance.profile_artifact.name}")
+        except Exception as e:
+            logger.error(f"Error saving profile for {model._meta.model_name} {pk}: {str(e)}")
+
+
+def profile_requested(request):
+    """Return True if the request asks to be profiled with ?profile=1 or a 'profile' field.
+
+    Only staff users may profile; anyone else asking gets a 403.
+    """
+    flag = request.query_params.get('profile') or request.data.get('profile')
+    if str(flag).lower() not in ('1', 'true', 'yes'):
+        return False
+    if not (request.user and request.user.is_staff):
+        raise PermissionDenied("Profiling is only available to admin users")
+    return True
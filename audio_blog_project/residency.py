@@ -0,0 +1,159 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from . import metrics
+from .backends import model_gate, release_accelerator_memory
+from .memory import memory_budget, MB
+
+logger = logging.getLogger(__name__)
+
+
+class ResidentModel:
+    """A backend that is loaded on first use and may be unloaded while idle.
+
+    Calls go through use(), which takes a slot on the model's gate, loads the
+    weights if they were unloaded and records the time of last use.
+    """
+
+    def __init__(self, name, backend):
+        self.name = name
+        self.backend = backend
+        self.loaded = False
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self._lock = threading.Lock()
+
+    @property
+    def memory_bytes(self):
+        return self.backend.memory_mb * MB
+
+    def idle_seconds(self):
+        return time.monotonic() - self.last_used
+
+    def load(self):
+        """Load the weights if they are not resident yet."""
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        if self.loaded:
+            return
+        with memory_budget.reserve(f"{self.name} model load", self.memory_bytes):
+            load_start = time.perf_counter()
+            self.backend.load()
+            metrics.MODEL_LOAD_SECONDS.observe(time.perf_counter() - load_start, model=self.name)
+        self.loaded = True
+        self.last_used = time.monotonic()
+        metrics.MODEL_RESIDENT.set(1, model=self.name)
+
+    @contextmanager
+    def use(self):
+        """Yield the loaded backend while holding one of its inference slots."""
+        with model_gate(self.name).slot():
+            with self._lock:
+                self._load()
+                self.in_use += 1
+            try:
+                yield self.backend
+            finally:
+                with self._lock:
+                    self.in_use -= 1
+                    self.last_used = time.monotonic()
+
+    def unload(self, reason, blocking=True):
+        """Unload the weights unless the model is in use. Returns True if it was unloaded.
+
+        With blocking=False a model whose lock is held (loading, or starting a
+        call) is skipped instead of waited for.
+        """
+        if not self._lock.acquire(blocking=blocking):
+            return False
+        try:
+            if not self.loaded or self.in_use:
+                return False
+            self.backend.unload()
+            self.loaded = False
+            metrics.MODEL_RESIDENT.set(0, model=self.name)
+        finally:
+            self._lock.release()
+
+        release_accelerator_memory()
+        metrics.MODEL_UNLOADS.inc(model=self.name, reason=reason)
+        logger.info(f"Unloaded {self.name} model ({reason})")
+        return True
+
+
+class ModelResidency:
+    """Tracks loaded models and unloads the ones that are not being used.
+
+    A sweeper thread unloads models idle for longer than settings.MODEL_IDLE_TTL
+    seconds (0 keeps them resident). When the memory budget cannot admit a job,
+    idle models are unloaded least recently used first to make room. Unloaded
+    models are loaded again by their next call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = {}
+        self._sweeper = None
+        memory_budget.add_pressure_handler(self.relieve)
+
+    def register(self, name, backend):
+        """Track `backend` under `name`, replacing any model registered before, and return it."""
+        model = ResidentModel(name, backend)
+        with self._lock:
+            previous = self._models.get(name)
+            self._models[name] = model
+        if previous is not None:
+            previous.unload('replaced')
+        metrics.MODEL_RESIDENT.set(0, model=name)
+        self._ensure_sweeper()
+        return model
+
+    def models(self):
+        with self._lock:
+            return list(self._models.values())
+
+    def relieve(self, needed_bytes):
+        """Unload idle models, least recently used first, until about needed_bytes are freed.
+
+        Called by the memory budget while it holds its own lock, so busy models
+        are skipped rather than waited for. Returns the bytes unloaded.
+        """
+        freed = 0
+        idle = sorted(
+            (m for m in self.models() if m.loaded and not m.in_use),
+            key=lambda m: m.last_used
+        )
+        for model in idle:
+            if freed >= needed_bytes:
+                break
+            if model.unload('memory_pressure', blocking=False):
+                freed += model.memory_bytes
+        return freed
+
+    def _ensure_sweeper(self):
+        if not settings.MODEL_IDLE_TTL:
+            return
+        with self._lock:
+            if self._sweeper is None or not self._sweeper.is_alive():
+                self._sweeper = threading.Thread(target=self._sweep, name='model-residency', daemon=True)
+                self._sweeper.start()
+
+    def _sweep(self):
+        """Unload models idle for longer than the TTL."""
+        while True:
+            time.sleep(settings.MODEL_IDLE_CHECK_INTERVAL)
+            ttl = settings.MODEL_IDLE_TTL
+            if not ttl:
+                continue
+            for model in self.models():
+                if model.loaded and not model.in_use and model.idle_seconds() > ttl:
+                    model.unload('idle')
+
+
+residency = ModelResidency()
@@ -76,6 +76,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'audio_blog_project.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -109,13 +110,26 @@ WSGI_APPLICATION = 'audio_blog_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# SQLite connection tuning, applied in audio_blog_project.db
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', 20))  # Seconds to wait for the write lock
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'timeout': SQLITE_BUSY_TIMEOUT,
+        },
     }
 }
 
+# Batched database writer used by transcription workers (transcription.writer)
+WRITER_BATCH_SIZE = int(os.getenv('WRITER_BATCH_SIZE', 1000))  # Segment rows per transaction
+WRITER_FLUSH_INTERVAL = float(os.getenv('WRITER_FLUSH_INTERVAL', 0.2))  # Seconds to gather writes
+WRITER_FLUSH_TIMEOUT = float(os.getenv('WRITER_FLUSH_TIMEOUT', 60))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -171,10 +185,37 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        # Uses orjson when installed, the stock encoder otherwise
+        'audio_blog_project.renderers.FastJSONRenderer',
     ],
 }
 
+# Transcripts: caching, audio retention, export and pagination
+# Rendered transcripts of completed jobs are cached per version (seconds, None = forever)
+TRANSCRIPT_CACHE_TIMEOUT = int(os.getenv('TRANSCRIPT_CACHE_TIMEOUT', 24 * 60 * 60))
+
+# Audio retention after transcription: 'keep' the original upload, 'archive' it as a
+# compact 16kHz mono copy (when smaller), or 'delete' it
+AUDIO_RETENTION_POLICY = os.getenv('AUDIO_RETENTION_POLICY', 'keep')
+AUDIO_ARCHIVE_FORMAT = os.getenv('AUDIO_ARCHIVE_FORMAT', 'flac')  # 'flac' or 'opus'
+AUDIO_COMPACT_AFTER_DAYS = int(os.getenv('AUDIO_COMPACT_AFTER_DAYS', 30))  # Default age for compact_audio
+# Sample type of the normalized 16kHz mono audio written at first processing:
+# 'float32' is memory-mapped without conversion, 'int16' takes half the disk space
+NORMALIZED_AUDIO_DTYPE = os.getenv('NORMALIZED_AUDIO_DTYPE', 'float32')
+
+# Segments fetched per query when streaming exports
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+# Pagination
+SEGMENT_PAGE_SIZE = int(os.getenv('SEGMENT_PAGE_SIZE', 100))
+SEGMENT_MAX_PAGE_SIZE = int(os.getenv('SEGMENT_MAX_PAGE_SIZE', 1000))
+TRANSCRIPTION_PAGE_SIZE = int(os.getenv('TRANSCRIPTION_PAGE_SIZE', 50))
+TRANSCRIPTION_MAX_PAGE_SIZE = int(os.getenv('TRANSCRIPTION_MAX_PAGE_SIZE', 500))
+
+# Responses are compressed with brotli (when the brotli package is installed
+# and the client accepts it) or gzip. Lower qualities compress faster.
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 4))
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = DEBUG  # Only for development
 CORS_ALLOWED_ORIGINS = [
@@ -185,11 +226,112 @@ CORS_ALLOWED_ORIGINS = [
 # File upload settings
 MAX_AUDIO_SIZE = int(os.getenv('MAX_AUDIO_SIZE', 104857600))  # 100MB default
 ALLOWED_AUDIO_EXTENSIONS = ['mp3', 'wav', 'm4a']
+MAX_BATCH_FILES = int(os.getenv('MAX_BATCH_FILES', 500))  # Files accepted per batch request
+
+# Inference backends
+# Set USE_FAKE_INFERENCE=True to swap every model for a deterministic fake with
+# configurable latency, e.g. to load-test the API and database on a CI box.
+USE_FAKE_INFERENCE = os.getenv('USE_FAKE_INFERENCE', 'False') == 'True'
+FAKE_INFERENCE_OPTIONS = {
+    'latency': float(os.getenv('FAKE_INFERENCE_LATENCY', 0.0)),  # Seconds per call
+    'latency_per_second': float(os.getenv('FAKE_INFERENCE_LATENCY_PER_SECOND', 0.0)),  # Seconds per unit of input
+    'load_latency': float(os.getenv('FAKE_INFERENCE_LOAD_LATENCY', 0.0)),  # Seconds to "load" a model
+}
+
+if USE_FAKE_INFERENCE:
+    INFERENCE_BACKENDS = {
+        'diarization': {
+            'BACKEND': 'transcription.backends.FakeDiarizationBackend',
+            'OPTIONS': FAKE_INFERENCE_OPTIONS,
+        },
+        'asr': {
+            'BACKEND': 'transcription.backends.FakeASRBackend',
+            'OPTIONS': FAKE_INFERENCE_OPTIONS,
+        },
+        'asr_fast': {
+            'BACKEND': 'transcription.backends.FakeASRBackend',
+            'OPTIONS': {**FAKE_INFERENCE_OPTIONS, 'confidence_spread': 0.5},
+        },
+        'title': {
+            'BACKEND': 'blog.backends.FakeTitleBackend',
+            'OPTIONS': FAKE_INFERENCE_OPTIONS,
+        },
+    }
+else:
+    INFERENCE_BACKENDS = {
+        'diarization': {
+            'BACKEND': 'transcription.backends.PyannoteDiarizationBackend',
+            'OPTIONS': {'model_name': 'pyannote/speaker-diarization-3.1'},
+        },
+        'asr': {
+            'BACKEND': 'transcription.backends.WhisperASRBackend',
+            'OPTIONS': {'model_name': os.getenv('WHISPER_MODEL', 'base')},
+        },
+        'asr_fast': {
+            'BACKEND': 'transcription.backends.WhisperASRBackend',
+            'OPTIONS': {'model_name': os.getenv('WHISPER_FAST_MODEL', 'tiny')},
+        },
+        'title': {
+            'BACKEND': 'blog.backends.BartTitleBackend',
+            'OPTIONS': {'model_name': 'facebook/bart-large-cnn'},
+        },
+    }
+
+# Concurrent calls allowed into each loaded model. A backend entry above may set
+# its own 'CONCURRENCY'; further callers queue up to INFERENCE_QUEUE_TIMEOUT
+# seconds (0 = forever), and at most INFERENCE_MAX_WAITING of them (0 = no limit).
+INFERENCE_CONCURRENCY = int(os.getenv('INFERENCE_CONCURRENCY', 1))
+INFERENCE_QUEUE_TIMEOUT = float(os.getenv('INFERENCE_QUEUE_TIMEOUT', 300))
+INFERENCE_MAX_WAITING = int(os.getenv('INFERENCE_MAX_WAITING', 0))
+
+# Loaded models idle for MODEL_IDLE_TTL seconds are unloaded and loaded again
+# on their next use (0 = keep them resident). Idle models are also unloaded
+# when the memory budget needs room for a job.
+MODEL_IDLE_TTL = float(os.getenv('MODEL_IDLE_TTL', 1800))
+MODEL_IDLE_CHECK_INTERVAL = float(os.getenv('MODEL_IDLE_CHECK_INTERVAL', 30))  # Seconds between idle sweeps
+
+# Watchdog: a transcription may run TRANSCRIPTION_TIMEOUT_BASE seconds plus
+# TRANSCRIPTION_TIMEOUT_FACTOR seconds per second of audio (both 0 = no limit)
+TRANSCRIPTION_TIMEOUT_BASE = float(os.getenv('TRANSCRIPTION_TIMEOUT_BASE', 300))
+TRANSCRIPTION_TIMEOUT_FACTOR = float(os.getenv('TRANSCRIPTION_TIMEOUT_FACTOR', 3.0))
+CANCEL_POLL_INTERVAL = float(os.getenv('CANCEL_POLL_INTERVAL', 1.0))  # Seconds between cancel flag checks
+
+# Store word-level timestamps and probabilities with each segment (packed, see
+# transcription/wordpack.py). Whisper needs an extra alignment pass for them,
+# so they are off unless asked for.
+WORD_TIMESTAMPS = os.getenv('WORD_TIMESTAMPS', 'False') == 'True'
+
+# Keep a voice embedding per diarized speaker and label speakers that match an
+# enrolled speaker with at least this cosine similarity (off unless asked for)
+SPEAKER_EMBEDDINGS = os.getenv('SPEAKER_EMBEDDINGS', 'False') == 'True'
+SPEAKER_MATCH_THRESHOLD = float(os.getenv('SPEAKER_MATCH_THRESHOLD', 0.75))
+
+# ASR cascade: decode every turn with the 'asr_fast' backend and re-decode with
+# 'asr' only the turns whose confidence is below the threshold
+ASR_CASCADE = os.getenv('ASR_CASCADE', 'False') == 'True'
+ASR_CASCADE_THRESHOLD = float(os.getenv('ASR_CASCADE_THRESHOLD', 0.6))
+
+# Transcribe the turns of each file in ASR_WORKERS processes, each with its own
+# ASR model, instead of in this process (0 = no worker processes)
+ASR_WORKERS = int(os.getenv('ASR_WORKERS', 0))
+
+# Memory guard for concurrent inference. Jobs start only when their projected
+# RSS fits in the budget; a job that pushes the process over it is stopped.
+MEMORY_BUDGET_MB = int(os.getenv('MEMORY_BUDGET_MB', 0))  # 0 = 80% of system RAM
+MEMORY_PER_AUDIO_SECOND_MB = float(os.getenv('MEMORY_PER_AUDIO_SECOND_MB', 1.0))  # Decode buffers and diarization working set
+MEMORY_PER_TITLE_JOB_MB = float(os.getenv('MEMORY_PER_TITLE_JOB_MB', 200))
+MEMORY_WAIT_TIMEOUT = int(os.getenv('MEMORY_WAIT_TIMEOUT', 600))  # Seconds a job may wait for memory
+MEMORY_SAMPLE_INTERVAL = float(os.getenv('MEMORY_SAMPLE_INTERVAL', 0.5))  # Seconds between RSS samples
+MEMORY_REQUEUE_LIMIT = int(os.getenv('MEMORY_REQUEUE_LIMIT', 2))  # Re-queues before a job is failed
+
+# Run every transcription and title job in this process under cProfile and the
+# torch profiler. Admins can also profile a single request with ?profile=1.
+PROFILE_INFERENCE = os.getenv('PROFILE_INFERENCE', 'False') == 'True'
 
 # Pyannote settings
 PYANNOTE_AUTH_TOKEN = os.getenv('PYANNOTE_AUTH_TOKEN')
 logger.info(f"Settings loaded - PYANNOTE_AUTH_TOKEN exists: {bool(PYANNOTE_AUTH_TOKEN)}")
-if not PYANNOTE_AUTH_TOKEN:
+if not PYANNOTE_AUTH_TOKEN and not USE_FAKE_INFERENCE:
     logger.error("PYANNOTE_AUTH_TOKEN environment variable is not set!")
     raise ValueError("PYANNOTE_AUTH_TOKEN environment variable is not set. Please set it in your .env file.")
 
@@ -19,6 +19,7 @@ from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
+from .metrics import metrics_view
 
 def home(request):
     """Home endpoint to show available API endpoints"""
@@ -42,6 +43,9 @@ urlpatterns = [
     
     # Admin
     path('admin/', admin.site.urls),
+
+    # Prometheus metrics
+    path('metrics', metrics_view, name='metrics'),
     
     # API routes
     path('api/blog/', include('blog.urls')),
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_alter_blogpost_options_blogpost_error_message_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='profile_artifact',
+            field=models.FileField(blank=True, null=True, upload_to='profiles/'),
+        ),
+    ]
@@ -24,6 +24,7 @@ class BlogPost(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     slug = models.SlugField(unique=True, blank=True)
+    profile_artifact = models.FileField(upload_to='profiles/', null=True, blank=True)  # Zip of profiler output
 
     def save(self, *args, **kwargs):
         """Override save to generate slug from title."""
@@ -4,11 +4,11 @@ import logging
 import time
 import random
 import os
-import torch
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-import tempfile
-import shutil
-from huggingface_hub import snapshot_download, HfFolder
+import threading
+from audio_blog_project import metrics
+from audio_blog_project.backends import get_backend
+from audio_blog_project.residency import residency
+from audio_blog_project.memory import memory_budget, MB
 
 logger = logging.getLogger(__name__)
 
@@ -80,71 +80,34 @@ class TitleSuggestionService:
 class TitleGenerationService:
     _instance = None
     _initialized = False
+    # Guards creation and model loading, so concurrent first requests load the model once
+    _lock = threading.Lock()
     
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(TitleGenerationService, cls).__new__(cls)
-        return cls._instance
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(TitleGenerationService, cls).__new__(cls)
+            return cls._instance
     
     def __init__(self):
         if TitleGenerationService._initialized:
             logger.info("TitleGenerationService already initialized, skipping initialization")
             return
-            
+
+        with TitleGenerationService._lock:
+            # Another thread may have finished loading while this one waited
+            if TitleGenerationService._initialized:
+                return
+            self._load_model()
+
+    def _load_model(self):
         try:
             logger.info("Initializing TitleGenerationService...")
-            
-            # Create cache directory
-            cache_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'model_cache')
-            os.makedirs(cache_dir, exist_ok=True)
-            logger.info(f"Created cache directory at: {cache_dir}")
-            
-            # Configure Hugging Face cache paths
-            os.environ['HF_HOME'] = cache_dir
-            os.environ['TRANSFORMERS_CACHE'] = os.path.join(cache_dir, 'transformers')
-            os.environ['HF_DATASETS_CACHE'] = os.path.join(cache_dir, 'datasets')
-            logger.info("Configured Hugging Face cache paths")
-            
-            # Verify token before proceeding
-            token = settings.PYANNOTE_AUTH_TOKEN  # Reuse the same token
-            if not token:
-                raise ValueError("PYANNOTE_AUTH_TOKEN not set in settings")
-            
-            # Set token in HfFolder for all Hugging Face operations
-            HfFolder.save_token(token)
-            logger.info("Token verified and set in HfFolder")
-            
-            # Initialize the title generation model
-            logger.info("Initializing title generation model...")
-            try:
-                # Use a model that's good at summarization and title generation
-                model_name = "facebook/bart-large-cnn"
-                
-                # Download model files
-                logger.info(f"Downloading model {model_name}...")
-                model_path = snapshot_download(
-                    model_name,
-                    use_auth_token=token,
-                    cache_dir=os.path.join(cache_dir, 'transformers'),
-                    local_files_only=False
-                )
-                
-                # Initialize tokenizer and model
-                self.tokenizer = AutoTokenizer.from_pretrained(model_path)
-                self.model = AutoModelForSeq2SeqLM.from_pretrained(model_path)
-                
-                # Move model to GPU if available
-                if torch.cuda.is_available():
-                    logger.info("Using GPU for title generation model")
-                    self.model = self.model.to(torch.device("cuda"))
-                else:
-                    logger.info("Using CPU for title generation model")
-                
-                logger.info("Title generation model initialized successfully")
-                
-            except Exception as e:
-                logger.error(f"Error initializing title generation model: {str(e)}")
-                raise
+
+            # Backend is selected in settings.INFERENCE_BACKENDS. It is loaded
+            # now and may be unloaded while idle (see ModelResidency).
+            self.backend = residency.register('title', get_backend('title'))
+            self.backend.load()
             
             TitleGenerationService._initialized = True
             
@@ -166,77 +129,18 @@ class TitleGenerationService:
         """
         try:
             logger.info("Generating title suggestions...")
-            
-            # Prepare the input
-            inputs = self.tokenizer(
-                content,
-                max_length=1024,
-                truncation=True,
-                return_tensors="pt"
-            )
-            
-            # Move inputs to GPU if available
-            if torch.cuda.is_available():
-                inputs = {k: v.to("cuda") for k, v in inputs.items()}
-            
-            # Generate multiple titles using different sampling strategies
-            titles = []
-            
-            # Strategy 1: Beam search
-            outputs = self.model.generate(
-                **inputs,
-                num_beams=5,
-                num_return_sequences=1,
-                max_length=max_length,
-                early_stopping=True
-            )
-            title = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            titles.append(title.strip())
-            
-            # Strategy 2: Top-k sampling
-            outputs = self.model.generate(
-                **inputs,
-                do_sample=True,
-                top_k=50,
-                num_return_sequences=1,
-                max_length=max_length,
-                early_stopping=True
-            )
-            title = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            if title.strip() not in titles:
-                titles.append(title.strip())
-            
-            # Strategy 3: Nucleus sampling
-            outputs = self.model.generate(
-                **inputs,
-                do_sample=True,
-                top_p=0.95,
-                num_return_sequences=1,
-                max_length=max_length,
-                early_stopping=True
-            )
-            title = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            if title.strip() not in titles:
-                titles.append(title.strip())
-            
-            # If we need more titles, use temperature sampling
-            while len(titles) < num_titles:
-                outputs = self.model.generate(
-                    **inputs,
-                    do_sample=True,
-                    temperature=0.8,
-                    num_return_sequences=1,
-                    max_length=max_length,
-                    early_stopping=True
-                )
-                title = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-                if title.strip() not in titles:
-                    titles.append(title.strip())
-            
-            logger.info(f"Generated {len(titles)} title suggestions")
-            return titles[:num_titles]  # Ensure we return exactly num_titles
+            start = time.perf_counter()
+            # Reload an idle-unloaded model before reserving memory for the call
+            self.backend.load()
+            with memory_budget.reserve("Title generation", int(settings.MEMORY_PER_TITLE_JOB_MB * MB)), \
+                    self.backend.use() as backend:
+                titles = backend.generate(content, num_titles=num_titles, max_length=max_length)
+            elapsed = time.perf_counter() - start
+            metrics.TITLE_GENERATION_SECONDS.observe(elapsed)
+            logger.info(f"Generated {len(titles)} title suggestions in {elapsed:.2f}s")
+            return titles
             
         except Exception as e:
             error_msg = f"Error generating titles: {str(e)}"
             logger.error(error_msg)
-            raise Exception(error_msg) 
\ No newline at end of file
+            raise Exception(error_msg)
@@ -1,3 +1,76 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+
+from .backends import FakeTitleBackend
+from .models import BlogPost
+from .services import TitleGenerationService
+
+CONTENT = "Growing tomatoes in a small garden. The garden needs sun, and tomatoes need water. Garden soil matters."
+
+
+class FakeTitleBackendTests(TestCase):
+    def test_titles_use_most_frequent_words(self):
+        titles = FakeTitleBackend().generate(CONTENT, num_titles=3)
+        self.assertEqual(titles, [
+            "Understanding Garden",
+            "A Closer Look at Garden",
+            "What Garden Means for Tomatoes",
+        ])
+
+    def test_deterministic(self):
+        backend = FakeTitleBackend()
+        self.assertEqual(backend.generate(CONTENT, num_titles=7), backend.generate(CONTENT, num_titles=7))
+
+    def test_extra_titles_are_numbered(self):
+        titles = FakeTitleBackend().generate(CONTENT, num_titles=7)
+        self.assertEqual(len(set(titles)), 7)
+        self.assertEqual(titles[5], "Understanding Garden (Part 2)")
+
+    def test_max_length(self):
+        titles = FakeTitleBackend().generate(CONTENT, num_titles=5, max_length=12)
+        self.assertTrue(all(len(title) <= 12 for title in titles))
+
+    def test_short_content(self):
+        self.assertEqual(FakeTitleBackend().generate("Hi", num_titles=1), ["Understanding Content"])
+
+
+@skipUnless(
+    settings.USE_FAKE_INFERENCE,
+    "title generation runs on the fake inference backends: set USE_FAKE_INFERENCE=True in the environment"
+)
+class BlogPostApiTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def test_title_service_uses_configured_backend(self):
+        self.assertEqual(TitleGenerationService().generate_titles(CONTENT), [
+            "Understanding Garden",
+            "A Closer Look at Garden",
+            "What Garden Means for Tomatoes",
+        ])
+
+    def test_create_without_content(self):
+        response = self.client.post(reverse('blogpost-list'), {})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(BlogPost.objects.exists())
+
+    def test_profile_requires_admin(self):
+        blog_post = BlogPost.objects.create(content=CONTENT, author=self.admin)
+        url = reverse('blogpost-profile', args=[blog_post.pk])
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_unloaded_model_is_reloaded(self):
+        service = TitleGenerationService()
+        service.generate_titles(CONTENT)
+        self.assertTrue(service.backend.unload('test'))
+        self.assertFalse(service.backend.loaded)
 
-# Create your tests here.
+        self.assertEqual(service.generate_titles(CONTENT, num_titles=1), ["Understanding Garden"])
+        self.assertTrue(service.backend.loaded)
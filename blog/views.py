@@ -2,10 +2,12 @@ from django.shortcuts import render
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from django.utils.text import slugify
 import logging
-from django.http import JsonResponse
+from django.http import JsonResponse, FileResponse
+from django.conf import settings
+import os
 from django.core.exceptions import ValidationError
 
 from .models import BlogPost, TitleSuggestion
@@ -16,6 +18,7 @@ from .serializers import (
     TitleSuggestionRequestSerializer
 )
 from .services import TitleSuggestionService, TitleGenerationService
+from audio_blog_project.profiling import profile_requested, profiled
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -48,6 +51,7 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         return BlogPostSerializer
 
     def create(self, request, *args, **kwargs):
+        profile = profile_requested(request)
         try:
             # Get content from request
             content = request.data.get('content')
@@ -66,11 +70,12 @@ class BlogPostViewSet(viewsets.ModelViewSet):
             # Generate title suggestions
             try:
                 service = TitleGenerationService()
-                titles = service.generate_titles(
-                    content=content,
-                    num_titles=3,
-                    max_length=50
-                )
+                with profiled(BlogPost, blog_post.id, profile or settings.PROFILE_INFERENCE):
+                    titles = service.generate_titles(
+                        content=content,
+                        num_titles=3,
+                        max_length=50
+                    )
                 
                 # Update blog post with first title suggestion
                 blog_post.title = titles[0]
@@ -103,6 +108,7 @@ class BlogPostViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def generate_titles(self, request, pk=None):
         """Generate new title suggestions for an existing blog post."""
+        profile = profile_requested(request)
         try:
             blog_post = self.get_object()
             
@@ -116,11 +122,12 @@ class BlogPostViewSet(viewsets.ModelViewSet):
             
             # Generate title suggestions
             service = TitleGenerationService()
-            titles = service.generate_titles(
-                content=blog_post.content,
-                num_titles=num_titles,
-                max_length=50
-            )
+            with profiled(BlogPost, blog_post.id, profile or settings.PROFILE_INFERENCE):
+                titles = service.generate_titles(
+                    content=blog_post.content,
+                    num_titles=num_titles,
+                    max_length=50
+                )
             
             return Response({
                 "blog_post_id": blog_post.id,
@@ -134,6 +141,21 @@ class BlogPostViewSet(viewsets.ModelViewSet):
                 "details": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=True, methods=['get'], permission_classes=[IsAdminUser])
+    def profile(self, request, pk=None):
+        """Download the profiler artifacts recorded for this blog post (admin only)."""
+        blog_post = self.get_object()
+        if not blog_post.profile_artifact:
+            return Response(
+                {"error": "No profile recorded for this blog post"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return FileResponse(
+            blog_post.profile_artifact.open('rb'),
+            as_attachment=True,
+            filename=os.path.basename(blog_post.profile_artifact.name)
+        )
+
     @action(detail=True, methods=['post'])
     def update_title(self, request, pk=None):
         """Update the blog post title."""
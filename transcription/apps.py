@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TranscriptionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'transcription'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from audio_blog_project import db  # noqa: F401
@@ -0,0 +1,160 @@
+import os
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Sample rate required by the diarization and ASR models
+SAMPLE_RATE = 16000
+
+
+@lru_cache(maxsize=None)
+def torch_available():
+    """Whether torch and torchaudio are installed. The fake backends run without them."""
+    try:
+        import torch  # noqa: F401
+        import torchaudio  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def load_audio(audio_path):
+    """Decode an audio file into a (channels, samples) waveform at its native rate.
+
+    Returns a torch tensor, or a float32 numpy array decoded with soundfile
+    when torch is not installed.
+    """
+    if not torch_available():
+        import numpy as np
+        import soundfile
+
+        samples, sample_rate = soundfile.read(audio_path, dtype='float32', always_2d=True)
+        return np.ascontiguousarray(samples.T), sample_rate
+
+    import torchaudio
+    return torchaudio.load(audio_path)
+
+
+def prepare_waveform(waveform, sample_rate):
+    """Downmix to mono and resample to 16kHz (required by the models)."""
+    if not torch_available():
+        return _prepare_numpy(waveform, sample_rate)
+
+    import torch
+    import torchaudio
+
+    # Convert to mono if stereo
+    if waveform.shape[0] > 1:
+        waveform = torch.mean(waveform, dim=0, keepdim=True)
+
+    # Resample to 16kHz if necessary
+    if sample_rate != SAMPLE_RATE:
+        resampler = torchaudio.transforms.Resample(sample_rate, SAMPLE_RATE)
+        waveform = resampler(waveform)
+
+    return waveform
+
+
+def _prepare_numpy(waveform, sample_rate, chunk_size=1 << 20):
+    """prepare_waveform for numpy arrays, resampling by linear interpolation.
+
+    Without torch only the fake backends can run, so interpolation is accurate
+    enough; it works in chunks to keep memory flat for long files.
+    """
+    import numpy as np
+
+    samples = waveform.mean(axis=0, dtype=np.float32) if waveform.shape[0] > 1 else waveform[0]
+    if sample_rate == SAMPLE_RATE or len(samples) < 2:
+        return np.asarray(samples, dtype=np.float32).reshape(1, -1)
+
+    step = sample_rate / SAMPLE_RATE
+    num_out = int(len(samples) / step)
+    resampled = np.empty(num_out, dtype=np.float32)
+    for start in range(0, num_out, chunk_size):
+        positions = np.arange(start, min(start + chunk_size, num_out)) * step
+        index = np.minimum(positions.astype(np.int64), len(samples) - 2)
+        fraction = (positions - index).astype(np.float32)
+        resampled[start:start + len(positions)] = (
+            samples[index] * (1.0 - fraction) + samples[index + 1] * fraction
+        )
+    return resampled.reshape(1, -1)
+
+
+def load_normalized(audio_path):
+    """Decode an audio file straight to a 16kHz mono (1, samples) waveform."""
+    waveform, sample_rate = load_audio(audio_path)
+    return prepare_waveform(waveform, sample_rate)
+
+
+# Raw normalized audio: headerless little-endian 16kHz mono samples; the
+# extension records the sample type
+NORMALIZED_DTYPES = {
+    'float32': ('<f4', 'f32'),
+    'int16': ('<i2', 's16'),
+}
+
+
+def normalized_extension(dtype=None):
+    from django.conf import settings
+    return NORMALIZED_DTYPES[dtype or settings.NORMALIZED_AUDIO_DTYPE][1]
+
+
+def _dtype_for(path):
+    extension = path.rsplit('.', 1)[-1]
+    for numpy_dtype, ext in NORMALIZED_DTYPES.values():
+        if ext == extension:
+            return numpy_dtype
+    raise ValueError(f"Not a normalized audio file: {path}")
+
+
+def write_normalized(waveform, path):
+    """Write a prepared (1, samples) waveform as raw samples in the type given by the extension."""
+    import numpy as np
+
+    numpy_dtype = _dtype_for(path)
+    samples = np.asarray(waveform[0])
+    if numpy_dtype == '<i2':
+        samples = (np.clip(samples, -1.0, 1.0) * 32767).astype(numpy_dtype)
+    else:
+        samples = samples.astype(numpy_dtype, copy=False)
+
+    # Write next to the destination and rename, so readers never see a partial file
+    temp_path = f"{path}.tmp"
+    samples.tofile(temp_path)
+    os.replace(temp_path, path)
+    return len(samples)
+
+
+def read_normalized(path):
+    """Memory-map a normalized audio file as a 1-D numpy array without reading it."""
+    import numpy as np
+
+    numpy_dtype = _dtype_for(path)
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=numpy_dtype)  # mmap cannot map an empty file
+    # Copy-on-write: pages are read lazily and the file is never modified
+    return np.memmap(path, dtype=numpy_dtype, mode='c')
+
+
+def open_normalized(path):
+    """Open a normalized audio file as a (1, samples) float waveform.
+
+    float32 files are returned as a zero-copy view of the memory map, so
+    slicing a turn touches only its own pages; int16 files are converted.
+    The waveform is a torch tensor, or a numpy array without torch.
+    """
+    samples = read_normalized(path)
+    if samples.dtype.kind == 'i':
+        samples = samples.astype('float32') / 32768.0
+    if not torch_available():
+        return samples.reshape(1, -1)
+
+    import torch
+    return torch.from_numpy(samples).reshape(1, -1)
+
+
+def normalized_duration(path):
+    """Duration in seconds of a normalized audio file, from its size alone."""
+    import numpy as np
+    return os.path.getsize(path) / np.dtype(_dtype_for(path)).itemsize / SAMPLE_RATE
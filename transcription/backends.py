@@ -0,0 +1,371 @@
+import os
+import math
+import zlib
+import logging
+import traceback
+import concurrent.futures
+
+from django.conf import settings
+
+from audio_blog_project.backends import (
+    InferenceBackend, FakeLatencyMixin, get_model_cache_dir, release_accelerator_memory
+)
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+HF_TERMS_HELP = (
+    "\nPlease make sure you have:"
+    "\n1. Accepted the terms of use at https://huggingface.co/pyannote/speaker-diarization-3.1"
+    "\n2. Accepted the terms of use at https://huggingface.co/pyannote/segmentation-3.1"
+    "\n3. Accepted the terms of use at https://huggingface.co/pyannote/embedding-3.1"
+    "\n4. Enabled 'Access to public gated repositories' in your Hugging Face token settings"
+)
+
+
+class DiarizationBackend(InferenceBackend):
+    """Splits a 16kHz mono waveform into speaker turns."""
+
+    def diarize(self, waveform, min_speakers=1, max_speakers=2, return_embeddings=False):
+        """Return a list of (start, end, speaker) tuples ordered by start time.
+
+        Args:
+            waveform: Mono float32 audio of shape (1, samples) at 16kHz
+            min_speakers: Minimum number of speakers to detect
+            max_speakers: Maximum number of speakers to detect
+            return_embeddings: Also return {speaker: 1-D float32 voice embedding},
+                as a (turns, embeddings) tuple
+        """
+        raise NotImplementedError
+
+
+class ASRBackend(InferenceBackend):
+    """Transcribes a single turn of speech."""
+
+    def transcribe(self, audio, language=None, word_timestamps=False):
+        """Return a dict with 'text', 'language' and 'confidence' for a 1-D 16kHz float32 array.
+
+        With word_timestamps=True the dict also has 'words': dicts with 'word',
+        'start', 'end' (seconds from the start of `audio`) and 'probability'.
+        """
+        raise NotImplementedError
+
+
+def verify_hf_token():
+    """Check PYANNOTE_AUTH_TOKEN against the Hugging Face API and store it for downloads."""
+    import requests
+    from huggingface_hub import HfFolder
+
+    token = settings.PYANNOTE_AUTH_TOKEN
+    if not token:
+        raise ValueError("PYANNOTE_AUTH_TOKEN not set in settings")
+
+    headers = {"Authorization": f"Bearer {token}"}
+    response = requests.get(
+        "https://huggingface.co/api/whoami",
+        headers=headers,
+        timeout=10
+    )
+    if response.status_code != 200:
+        error_msg = f"Token verification failed with {response.status_code} {response.reason}"
+        logger.error(error_msg)
+        logger.error(f"Response content: {response.text}")
+        raise ValueError(f"Invalid or expired Hugging Face token. Please check your token and ensure it has the correct permissions.")
+
+    # Set token in HfFolder for all Hugging Face operations
+    HfFolder.save_token(token)
+    logger.info("Token verified and set in HfFolder")
+    return token
+
+
+class PyannoteDiarizationBackend(DiarizationBackend):
+    """Speaker diarization with pyannote/speaker-diarization-3.1."""
+
+    memory_mb = 600
+
+    def __init__(self, model_name="pyannote/speaker-diarization-3.1", download_timeout=300):
+        self.model_name = model_name
+        self.download_timeout = download_timeout
+        self.pipeline = None
+
+    def load(self):
+        # Imported here so fake backends work without the model packages installed
+        import torch
+        import huggingface_hub
+        from huggingface_hub import snapshot_download
+        from pyannote.audio import Pipeline
+
+        logger.info("Initializing diarization pipeline...")
+        try:
+            cache_dir = get_model_cache_dir()
+            token = verify_hf_token()
+
+            # Set timeout for requests
+            huggingface_hub.constants.HF_HUB_DOWNLOAD_TIMEOUT = self.download_timeout
+
+            # Download model files with timeout
+            logger.info("Downloading model files...")
+            with concurrent.futures.ThreadPoolExecutor() as executor:
+                future = executor.submit(
+                    snapshot_download,
+                    self.model_name,
+                    use_auth_token=token,
+                    cache_dir=os.path.join(cache_dir, 'pyannote'),
+                    local_files_only=False
+                )
+                try:
+                    model_path = future.result(timeout=self.download_timeout)
+                    logger.info(f"Model files downloaded to: {model_path}")
+                except concurrent.futures.TimeoutError:
+                    raise Exception(f"Model download timed out after {self.download_timeout} seconds")
+                except Exception as e:
+                    if "401" in str(e):
+                        raise Exception("Invalid or expired Hugging Face token. Please check your token and ensure it has the correct permissions.")
+                    raise Exception(f"Model download failed: {str(e)}")
+
+            # Initialize the pipeline with the downloaded model
+            logger.info("Loading pipeline from downloaded model...")
+            self.pipeline = Pipeline.from_pretrained(
+                model_path,
+                use_auth_token=token
+            )
+
+            # Test the pipeline with a dummy input
+            logger.info("Testing pipeline initialization...")
+            self.pipeline(
+                {"waveform": torch.zeros((1, SAMPLE_RATE)), "sample_rate": SAMPLE_RATE},
+                min_speakers=1,
+                max_speakers=2
+            )
+            logger.info("Pipeline test successful")
+
+            # Move pipeline to GPU if available
+            if torch.cuda.is_available():
+                logger.info("Using GPU for diarization")
+                self.pipeline = self.pipeline.to(torch.device("cuda"))
+            else:
+                logger.info("Using CPU for diarization")
+
+        except Exception as e:
+            logger.error(f"Error initializing diarization pipeline: {str(e)}\n{traceback.format_exc()}")
+            if "401" in str(e):
+                raise Exception("Invalid or expired Hugging Face token. Please check your token and ensure it has the correct permissions." + HF_TERMS_HELP)
+            raise Exception(f"Diarization pipeline initialization failed: {str(e)}")
+
+    def unload(self):
+        self.pipeline = None
+
+    def diarize(self, waveform, min_speakers=1, max_speakers=2, return_embeddings=False):
+        import torch
+        import numpy as np
+
+        output = self.pipeline(
+            {"waveform": torch.as_tensor(waveform), "sample_rate": SAMPLE_RATE},
+            min_speakers=min_speakers,
+            max_speakers=max_speakers,
+            min_duration_on=0.5,
+            min_duration_off=0.5,
+            return_embeddings=return_embeddings
+        )
+        annotation, embeddings = output if return_embeddings else (output, None)
+        turns = [
+            (turn.start, turn.end, speaker)
+            for turn, _, speaker in annotation.itertracks(yield_label=True)
+        ]
+        if not return_embeddings:
+            return turns
+
+        # The pipeline returns one centroid per speaker, in the order of labels()
+        speaker_embeddings = {}
+        for speaker, vector in zip(annotation.labels(), embeddings):
+            vector = np.asarray(vector, dtype=np.float32)
+            if np.all(np.isfinite(vector)):
+                speaker_embeddings[speaker] = vector
+        return turns, speaker_embeddings
+
+
+class WhisperASRBackend(ASRBackend):
+    """Speech recognition with OpenAI Whisper."""
+
+    # Approximate fp32 resident size per model, in MB
+    MODEL_MEMORY_MB = {
+        'tiny': 150, 'base': 300, 'small': 1000,
+        'medium': 3000, 'large': 6000, 'turbo': 3200,
+    }
+
+    def __init__(self, model_name="base"):
+        self.model_name = model_name
+        self.model = None
+        self.memory_mb = self.MODEL_MEMORY_MB.get(model_name.split('.')[0].split('-')[0], 3000)
+
+    def load(self):
+        import torch
+        import whisper
+
+        logger.info(f"Initializing Whisper model '{self.model_name}'...")
+        try:
+            # Force garbage collection before loading model
+            release_accelerator_memory()
+
+            self.model = whisper.load_model(
+                self.model_name,
+                download_root=os.path.join(get_model_cache_dir(), 'whisper'),
+                device='cuda' if torch.cuda.is_available() else 'cpu'
+            )
+            logger.info("Whisper model initialized successfully")
+        except Exception as e:
+            logger.error(f"Error initializing Whisper model: {str(e)}")
+            raise
+
+    def unload(self):
+        self.model = None
+
+    def transcribe(self, audio, language=None, word_timestamps=False):
+        result = self.model.transcribe(
+            audio,
+            language=language,  # Use provided language or auto-detect
+            task="transcribe",
+            word_timestamps=word_timestamps
+        )
+        output = {
+            'text': result["text"].strip(),
+            'language': result.get("language", language or "en"),
+            'confidence': whisper_confidence(result.get("segments", [])),
+        }
+        if word_timestamps:
+            output['words'] = [
+                {
+                    'word': word['word'].strip(),
+                    'start': word['start'],
+                    'end': word['end'],
+                    'probability': word.get('probability', 1.0),
+                }
+                for segment in result.get("segments", [])
+                for word in segment.get('words', [])
+            ]
+        return output
+
+
+def whisper_confidence(segments):
+    """Confidence in [0, 1] for a Whisper result, from its decoded segments.
+
+    Each segment scores exp(avg_logprob), the geometric mean token
+    probability, scaled by the probability that it contains speech at all
+    (1 - no_speech_prob). Segments are weighted by duration.
+    """
+    total = 0.0
+    weight = 0.0
+    for segment in segments:
+        duration = max(segment['end'] - segment['start'], 0.01)
+        score = math.exp(min(segment['avg_logprob'], 0.0)) * (1.0 - segment['no_speech_prob'])
+        total += score * duration
+        weight += duration
+    return total / weight if weight else 0.0
+
+
+FAKE_WORDS = (
+    "the quick brown fox jumps over a lazy dog while we talk about audio "
+    "transcription speaker models latency throughput and the weather today"
+).split()
+
+
+class FakeDiarizationBackend(FakeLatencyMixin, DiarizationBackend):
+    """Deterministic diarization: fixed-length turns alternating between speakers."""
+
+    def __init__(self, turn_length=4.0, num_speakers=2, **kwargs):
+        super().__init__(**kwargs)
+        self.turn_length = float(turn_length)
+        self.num_speakers = int(num_speakers)
+
+    def diarize(self, waveform, min_speakers=1, max_speakers=2, return_embeddings=False):
+        duration = waveform.shape[-1] / SAMPLE_RATE
+        self.simulate(duration)
+
+        speakers = max(min_speakers, min(self.num_speakers, max_speakers))
+        turns = []
+        start = 0.0
+        index = 0
+        while start < duration:
+            end = min(start + self.turn_length, duration)
+            turns.append((start, end, f"SPEAKER_{index % speakers:02d}"))
+            start = end
+            index += 1
+        if not return_embeddings:
+            return turns
+        return turns, self.embed(waveform, turns)
+
+    def embed(self, waveform, turns, bands=64):
+        """Log band energies of each speaker's audio, a stand-in for a voice embedding.
+
+        Speakers with different pitch get different vectors, and the same
+        voice points the same way in every recording. A recording with a
+        single speaker has nothing to contrast with and gets a zero vector.
+        """
+        import numpy as np
+
+        samples = np.asarray(waveform[0], dtype=np.float32)
+        frame = 1024
+        edges = np.unique(np.geomspace(1, frame // 2 + 1, bands + 1).astype(int))
+        spectra = {}
+        for start, end, speaker in turns:
+            chunk = samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+            frames = len(chunk) // frame
+            if not frames:
+                continue
+            magnitude = np.abs(np.fft.rfft(chunk[:frames * frame].reshape(frames, frame), axis=1)).sum(axis=0)
+            spectra[speaker] = spectra.get(speaker, 0) + magnitude
+
+        # Relative to the recording's average spectrum, so what remains is what sets a voice apart
+        bands_by_speaker = {
+            speaker: np.log1p(np.add.reduceat(magnitude / magnitude.sum(), edges[:-1]) * 1000)
+            for speaker, magnitude in spectra.items()
+        }
+        if not bands_by_speaker:
+            return {}
+        average = np.mean(list(bands_by_speaker.values()), axis=0)
+        return {
+            speaker: (bands - average).astype(np.float32)
+            for speaker, bands in bands_by_speaker.items()
+        }
+
+
+class FakeASRBackend(FakeLatencyMixin, ASRBackend):
+    """Deterministic ASR: text derived from the turn length, about 2.5 words per second.
+
+    Confidence is `confidence`, lowered for some turns by up to
+    `confidence_spread` so that cascades have uncertain turns to re-decode.
+    """
+
+    def __init__(self, words_per_second=2.5, confidence=0.9, confidence_spread=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.words_per_second = float(words_per_second)
+        self.confidence = float(confidence)
+        self.confidence_spread = float(confidence_spread)
+
+    def transcribe(self, audio, language=None, word_timestamps=False):
+        duration = len(audio) / SAMPLE_RATE
+        self.simulate(duration)
+
+        seed = zlib.crc32(str(len(audio)).encode())
+        count = max(1, int(duration * self.words_per_second))
+        words = [FAKE_WORDS[(seed + i * 7) % len(FAKE_WORDS)] for i in range(count)]
+        confidence = self.confidence - self.confidence_spread * (zlib.crc32(audio[:1600].tobytes()) % 100) / 100.0
+        result = {
+            'text': " ".join(words).capitalize() + ".",
+            'language': language or "en",
+            'confidence': confidence,
+        }
+        if word_timestamps:
+            # Words evenly spaced over the turn, each taking 80% of its slot
+            slot = duration / count
+            result['words'] = [
+                {
+                    'word': word,
+                    'start': i * slot,
+                    'end': (i + 0.8) * slot,
+                    'probability': min(1.0, confidence + 0.05 * ((seed + i) % 3 - 1)),
+                }
+                for i, word in enumerate(words)
+            ]
+        return result
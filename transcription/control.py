@@ -0,0 +1,64 @@
+import time
+import logging
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Transcription
+
+logger = logging.getLogger(__name__)
+
+
+class JobStopped(Exception):
+    """A transcription was stopped before finishing; `status` is its final status."""
+    status = 'failed'
+
+
+class JobCancelled(JobStopped):
+    status = 'cancelled'
+
+
+class JobTimedOut(JobStopped):
+    status = 'timed_out'
+
+
+def time_limit(duration):
+    """Wall-clock limit in seconds for transcribing `duration` seconds of audio, or None."""
+    limit = settings.TRANSCRIPTION_TIMEOUT_BASE + settings.TRANSCRIPTION_TIMEOUT_FACTOR * (duration or 0.0)
+    return limit if limit > 0 else None
+
+
+class JobControl:
+    """Checkpoint called between pipeline stages and speaker turns of one job.
+
+    Raises JobCancelled once cancellation was requested through the API or
+    the job is marked cancelled, JobTimedOut when the job runs past its time
+    limit, and whatever the extra `checks` raise (e.g. the memory budget).
+    The cancel flag lives in the database so any process can set it; it is
+    polled at most every settings.CANCEL_POLL_INTERVAL seconds.
+
+    A single model call cannot be interrupted, so a job stops at the next
+    checkpoint after the limit or the request.
+    """
+
+    def __init__(self, transcription_id, duration, checks=()):
+        self.transcription_id = transcription_id
+        self.checks = list(checks)
+        self.limit = time_limit(duration)
+        self.started = time.monotonic()
+        self._last_poll = None
+
+    def __call__(self):
+        for check in self.checks:
+            check()
+
+        now = time.monotonic()
+        if self.limit is not None and now - self.started > self.limit:
+            raise JobTimedOut(f"Transcription exceeded its time limit of {self.limit:.1f}s")
+
+        if self._last_poll is None or now - self._last_poll >= settings.CANCEL_POLL_INTERVAL:
+            self._last_poll = now
+            if Transcription.objects.filter(
+                Q(cancel_requested=True) | Q(status='cancelled'), pk=self.transcription_id
+            ).exists():
+                raise JobCancelled("Transcription was cancelled")
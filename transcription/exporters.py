@@ -0,0 +1,77 @@
+import os
+
+from django.conf import settings
+
+from .models import TranscriptionSegment
+
+SEGMENT_FIELDS = ('speaker', 'speaker_label', 'start_time', 'end_time', 'text')
+
+
+def iter_segments(transcription):
+    """Yield segment rows in time order, fetched from the database in chunks."""
+    return TranscriptionSegment.objects.filter(
+        transcription=transcription
+    ).order_by('start_time', 'id').values_list(*SEGMENT_FIELDS).iterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE
+    )
+
+
+def _timestamp(seconds, separator):
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def export_srt(transcription):
+    for index, (speaker, label, start, end, text) in enumerate(iter_segments(transcription), start=1):
+        yield (
+            f"{index}\n"
+            f"{_timestamp(start, ',')} --> {_timestamp(end, ',')}\n"
+            f"{label or speaker}: {text}\n\n"
+        )
+
+
+def export_vtt(transcription):
+    yield "WEBVTT\n\n"
+    for speaker, label, start, end, text in iter_segments(transcription):
+        yield (
+            f"{_timestamp(start, '.')} --> {_timestamp(end, '.')}\n"
+            f"<v {label or speaker}>{text}\n\n"
+        )
+
+
+def export_rttm(transcription):
+    file_id = os.path.splitext(os.path.basename(transcription.audio_file.name))[0] or f"transcription_{transcription.id}"
+    for speaker, label, start, end, text in iter_segments(transcription):
+        yield f"SPEAKER {file_id} 1 {start:.3f} {end - start:.3f} <NA> <NA> {speaker} <NA> <NA>\n"
+
+
+def export_txt(transcription):
+    for speaker, label, start, end, text in iter_segments(transcription):
+        yield f"[{start:.2f}-{end:.2f}] {label or speaker}: {text}\n"
+
+
+# format -> (line generator, content type, file extension)
+EXPORTERS = {
+    'srt': (export_srt, 'application/x-subrip; charset=utf-8', 'srt'),
+    'vtt': (export_vtt, 'text/vtt; charset=utf-8', 'vtt'),
+    'rttm': (export_rttm, 'text/plain; charset=utf-8', 'rttm'),
+    'txt': (export_txt, 'text/plain; charset=utf-8', 'txt'),
+}
+
+
+def buffered(lines, size=64 * 1024):
+    """Join generated lines into chunks of about `size` characters for the response."""
+    buffer = []
+    length = 0
+    for line in lines:
+        buffer.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
@@ -0,0 +1,151 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from django.conf import settings
+
+from audio_blog_project.backends import InferenceBackend, get_backend
+from .audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# ASR models loaded once per worker process by _init_worker
+_worker_asr = None
+_worker_fast_asr = None
+_started = None
+
+
+def _init_worker(cascade, started):
+    """Process pool initializer: set up Django and load the ASR models once per process."""
+    global _worker_asr, _worker_fast_asr, _started
+    _started = started
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+    _worker_asr = get_backend('asr')
+    _worker_asr.load()
+    if cascade:
+        _worker_fast_asr = get_backend('asr_fast')
+        _worker_fast_asr.load()
+
+
+def _ready(_):
+    # Hold this task until every worker has loaded its models and taken one,
+    # so no worker can answer for another
+    _started.wait()
+    return os.getpid()
+
+
+def _transcribe_turn(shm_name, num_samples, start, end, language, word_timestamps):
+    """Transcribe samples [start, end) of the shared waveform in a worker process."""
+    # Spawned workers share the parent's resource tracker, so attaching here
+    # does not hand ownership of the block over; the parent unlinks it
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        waveform = np.ndarray((num_samples,), dtype=np.float32, buffer=shm.buf)
+        # Copy the turn out so the block can be closed while the model runs
+        audio = np.array(waveform[start:end])
+        del waveform
+    finally:
+        shm.close()
+
+    if _worker_fast_asr is None:
+        result = _worker_asr.transcribe(audio, language=language, word_timestamps=word_timestamps)
+        result['decoded_by'] = None
+    else:
+        result = _worker_fast_asr.transcribe(audio, language=language, word_timestamps=word_timestamps)
+        result['decoded_by'] = 'fast'
+        if result['confidence'] < settings.ASR_CASCADE_THRESHOLD:
+            result = _worker_asr.transcribe(audio, language=language, word_timestamps=word_timestamps)
+            result['decoded_by'] = 'main'
+    return result
+
+
+class ASRWorkerPool(InferenceBackend):
+    """A pool of processes, each with its own ASR model, that share the turns of one file.
+
+    The prepared waveform is copied once into a shared memory block; each
+    task carries only the block name and the turn's sample range. Results come
+    back in turn order. Registered with the model residency manager, so the
+    pool is counted against the memory budget, shut down when idle and
+    started again on its next use.
+    """
+
+    def __init__(self, workers):
+        self.workers = max(1, int(workers))
+        self.executor = None
+        per_worker = get_backend('asr').memory_mb
+        if settings.ASR_CASCADE:
+            per_worker += get_backend('asr_fast').memory_mb
+        self.memory_mb = per_worker * self.workers
+
+    def load(self):
+        logger.info(f"Starting {self.workers} ASR worker processes...")
+        context = multiprocessing.get_context('spawn')
+        started = context.Barrier(self.workers)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(settings.ASR_CASCADE, started)
+        )
+        # Start every worker and wait until all of them have loaded their models
+        try:
+            pids = set(self.executor.map(_ready, range(self.workers)))
+        except Exception:
+            # Release the workers still waiting for one that failed to start
+            started.abort()
+            self.unload()
+            raise
+        logger.info(f"ASR worker pool ready ({len(pids)} processes)")
+
+    def unload(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def transcribe_turns(self, waveform, turns, language=None, word_timestamps=False,
+                         checkpoint=None, progress=None):
+        """Transcribe (start, end, speaker) turns of a (1, samples) 16kHz waveform in parallel.
+
+        Args:
+            checkpoint: Optional callable run before collecting each result; if
+                it raises, the turns not started yet are cancelled
+            progress: Optional callable receiving the fraction of turns done
+
+        Returns:
+            list: One ASR result dict per turn, in the order of `turns`
+        """
+        samples = np.asarray(waveform[0], dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(samples.nbytes, 1))
+        futures = []
+        try:
+            shared = np.ndarray(samples.shape, dtype=np.float32, buffer=shm.buf)
+            shared[:] = samples
+            del shared
+
+            for start, end, _ in turns:
+                futures.append(self.executor.submit(
+                    _transcribe_turn, shm.name, len(samples),
+                    int(start * SAMPLE_RATE), int(end * SAMPLE_RATE),
+                    language, word_timestamps
+                ))
+
+            results = []
+            for index, future in enumerate(futures, start=1):
+                if checkpoint:
+                    checkpoint()
+                results.append(future.result())
+                if progress:
+                    progress(index / len(futures))
+            return results
+        finally:
+            for future in futures:
+                future.cancel()
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,129 @@
+import os
+import logging
+import queue
+import threading
+import traceback
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from audio_blog_project import metrics
+from audio_blog_project.memory import MemoryBudgetExceeded
+from .control import JobStopped
+from .models import Transcription
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionWorker:
+    """Background worker that runs queued transcriptions on one warm TranscriptionService.
+
+    Jobs are submitted in groups (for example all files of a batch). A group is
+    processed back to back on the same service instance so the models are loaded
+    once, with the shortest files first so small clips are not stuck behind long
+    recordings.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._requeues = {}  # transcription id -> times re-queued for memory
+
+    def submit(self, transcription_ids):
+        """Queue a group of transcriptions for background processing."""
+        transcription_ids = list(transcription_ids)
+        if not transcription_ids:
+            return
+        metrics.TRANSCRIPTION_QUEUE_DEPTH.inc(len(transcription_ids))
+        self._queue.put(transcription_ids)
+        logger.info(f"Queued {len(transcription_ids)} transcriptions for background processing")
+        self._ensure_started()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='transcription-worker',
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            transcription_ids = self._queue.get()
+            try:
+                self._process_group(transcription_ids)
+            except Exception as e:
+                logger.error(f"Error processing transcription group: {str(e)}\n{traceback.format_exc()}")
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+    def _process_group(self, transcription_ids):
+        from .services import TranscriptionService
+
+        remaining = len(transcription_ids)
+        try:
+            transcriptions = list(
+                Transcription.objects.filter(id__in=transcription_ids, status='pending')
+            )
+            transcriptions.sort(key=_audio_size)
+            if not transcriptions:
+                return
+
+            try:
+                service = TranscriptionService()
+            except Exception as e:
+                error_msg = f"Error initializing transcription service: {str(e)}"
+                logger.error(error_msg)
+                Transcription.objects.filter(
+                    id__in=[t.id for t in transcriptions]
+                ).update(status='failed', error_message=error_msg)
+                return
+
+            for transcription in transcriptions:
+                metrics.TRANSCRIPTION_QUEUE_DEPTH.dec()
+                remaining -= 1
+                language = None if transcription.language == 'auto' else transcription.language
+                try:
+                    service.transcribe_audio(
+                        audio_path=transcription.audio_path,
+                        transcription_id=transcription.id,
+                        language=language
+                    )
+                except MemoryBudgetExceeded as e:
+                    self._requeue(transcription, e)
+                except JobStopped as e:
+                    logger.info(f"Background transcription {transcription.id} {e.status}: {str(e)}")
+                except Exception as e:
+                    # transcribe_audio already marked the transcription as failed
+                    logger.error(f"Background transcription {transcription.id} failed: {str(e)}")
+        finally:
+            # Jobs that were skipped or never started still leave the queue
+            metrics.TRANSCRIPTION_QUEUE_DEPTH.dec(remaining)
+
+
+    def _requeue(self, transcription, error):
+        """Put a job stopped by the memory budget back at the end of the queue."""
+        attempts = self._requeues.get(transcription.id, 0)
+        if attempts >= settings.MEMORY_REQUEUE_LIMIT:
+            self._requeues.pop(transcription.id, None)
+            logger.error(f"Transcription {transcription.id} failed after {attempts} memory re-queues: {str(error)}")
+            return
+
+        self._requeues[transcription.id] = attempts + 1
+        Transcription.objects.filter(id=transcription.id).update(status='pending', error_message=None)
+        logger.warning(f"Re-queueing transcription {transcription.id} ({attempts + 1}/{settings.MEMORY_REQUEUE_LIMIT}): {str(error)}")
+        self.submit([transcription.id])
+
+
+def _audio_size(transcription):
+    try:
+        return os.path.getsize(transcription.audio_path)
+    except (OSError, TypeError):
+        return 0
+
+
+transcription_worker = TranscriptionWorker()
@@ -0,0 +1,240 @@
+import os
+import sys
+import json
+import math
+import time
+import wave
+import platform
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.settings import api_settings
+
+from transcription.models import Transcription, TranscriptionSegment
+from transcription.services import TranscriptionService
+from transcription.queries import TranscriptQueryService
+from blog.services import TitleGenerationService
+from audio_blog_project.memory import memory_budget, MB
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def generate_conversation(path, duration, num_speakers=2, sample_rate=44100, seed=0):
+    """Write a synthetic stereo conversation of alternating speakers to a WAV file.
+
+    Each speaker is a harmonic tone with its own pitch and a syllable-rate
+    amplitude envelope, separated by short pauses. This is not speech, but it
+    has the shape the pipeline cares about: turns, silences and distinct voices.
+    The file is 44.1kHz stereo so decode, downmix and resampling are exercised.
+    """
+    rng = np.random.default_rng(seed)
+    pitches = [110.0 + 60.0 * i for i in range(num_speakers)]
+    total = int(duration * sample_rate)
+    audio = np.zeros(total, dtype=np.float32)
+
+    position = 0
+    speaker = 0
+    while position < total:
+        turn = int(rng.uniform(2.0, 6.0) * sample_rate)
+        t = np.arange(min(turn, total - position)) / sample_rate
+        pitch = pitches[speaker]
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3.0, 5.0) * t))
+        audio[position:position + len(t)] = 0.3 * voice * envelope
+        position += len(t) + int(rng.uniform(0.3, 1.0) * sample_rate)
+        speaker = (speaker + 1) % num_speakers
+
+    audio += rng.normal(0, 0.005, total).astype(np.float32)
+    pcm = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+    stereo = np.repeat(pcm[:, None], 2, axis=1)
+
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(stereo.tobytes())
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def summarize(values):
+    return {
+        'count': len(values),
+        'total': sum(values),
+        'mean': sum(values) / len(values) if values else None,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'max': max(values) if values else None,
+    }
+
+
+def peak_rss_mb(sampled_bytes=0):
+    """Peak resident memory of this process and its worker processes, in MB.
+
+    ru_maxrss covers this process and, through RUSAGE_CHILDREN, workers that
+    have already exited. Workers that are still running (the ASR pool) only
+    show up in sampled_bytes, the largest process-tree RSS seen between stages.
+    """
+    peak = sampled_bytes / MB
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        unit = 1 if sys.platform == 'darwin' else 1024
+        rusage_peak = sum(
+            resource.getrusage(who).ru_maxrss * unit for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)
+        )
+        peak = max(peak, rusage_peak / MB)
+    return peak
+
+
+class Command(BaseCommand):
+    help = 'Benchmark each transcription stage and title generation on synthetic audio, output JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=60.0, help='Length of the synthetic audio in seconds')
+        parser.add_argument('--speakers', type=int, default=2, help='Number of synthetic speakers')
+        parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs')
+        parser.add_argument('--language', default='en', help='Language passed to Whisper')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic audio')
+        parser.add_argument('--skip-titles', action='store_true', help='Do not benchmark title generation')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        if options['duration'] <= 0 or options['repeat'] < 1 or options['speakers'] < 1:
+            raise CommandError("--duration, --repeat and --speakers must be positive")
+
+        self.timings = {}
+        self.peak_rss = 0
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            audio_path = os.path.join(temp_dir, 'benchmark.wav')
+            generate_conversation(
+                audio_path, options['duration'], num_speakers=options['speakers'], seed=options['seed']
+            )
+
+            with self.timed('model_load'):
+                service = TranscriptionService()
+
+            rtfs = []
+            transcript = ''
+            for _ in range(options['repeat']):
+                run_start = time.perf_counter()
+                result = self.run_transcription(service, audio_path, options['language'])
+                transcript = self.run_persistence(service, audio_path, result)
+                rtfs.append((time.perf_counter() - run_start) / result['duration'])
+
+        if not options['skip_titles']:
+            with self.timed('title_model_load'):
+                title_service = TitleGenerationService()
+            content = transcript or "Synthetic benchmark content for title generation. " * 10
+            for _ in range(options['repeat']):
+                with self.timed('title_generation'):
+                    title_service.generate_titles(content=content, num_titles=3, max_length=50)
+
+        report = {
+            'config': {
+                'duration': options['duration'],
+                'speakers': options['speakers'],
+                'repeat': options['repeat'],
+                'language': options['language'],
+                'seed': options['seed'],
+            },
+            'environment': self.environment(),
+            'stages': {name: summarize(values) for name, values in self.timings.items()},
+            'real_time_factor': summarize(rtfs),
+            'peak_rss_mb': peak_rss_mb(self.peak_rss),
+        }
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+            self.stderr.write(f"Benchmark report written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.setdefault(stage, []).append(time.perf_counter() - start)
+            self.peak_rss = max(self.peak_rss, memory_budget.rss())
+
+    def run_transcription(self, service, audio_path, language):
+        """Run the pipeline stage by stage, mirroring TranscriptionService.transcribe_file."""
+        with self.timed('decode'):
+            waveform, sample_rate = service.load_audio(audio_path)
+        duration = waveform.shape[1] / sample_rate
+
+        with self.timed('resample'):
+            waveform = service.prepare_waveform(waveform, sample_rate)
+
+        with self.timed('diarization'):
+            turns = service.diarize(waveform)
+
+        speakers = {speaker for _, _, speaker in turns}
+        segments = []
+        if service.asr_pool is not None:
+            # Turns are decoded concurrently in the ASR workers, so time the file
+            with self.timed('asr_pool'):
+                segments = service.transcribe_turns_parallel(waveform, turns, language=language)
+        else:
+            for start, end, speaker in turns:
+                with self.timed('asr_turn'):
+                    segments.append(
+                        service.transcribe_turn(waveform, start, end, speaker, language=language)
+                    )
+
+        return {'duration': duration, 'num_speakers': len(speakers), 'segments': segments}
+
+    def run_persistence(self, service, audio_path, result):
+        """Time the database write and JSON rendering, then roll everything back."""
+        with transaction.atomic():
+            with self.timed('db_persistence'):
+                transcription = Transcription.objects.create(
+                    audio_file=os.path.basename(audio_path),
+                    status='completed',
+                    duration=result['duration'],
+                    num_speakers=result['num_speakers']
+                )
+                TranscriptionSegment.objects.bulk_create(
+                    service.build_segments(transcription, result['segments'])
+                )
+
+            with self.timed('json_rendering'):
+                payload = TranscriptQueryService().get_transcription_text(transcription.id, format='json')
+                # Time the renderer the API responds with
+                api_settings.DEFAULT_RENDERER_CLASSES[0]().render(payload)
+
+            text = TranscriptQueryService().get_transcription_text(transcription.id, format='text')
+            transaction.set_rollback(True)
+
+        return text
+
+    def environment(self):
+        info = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        }
+        try:
+            import torch
+            info['torch'] = torch.__version__
+            info['cuda'] = torch.cuda.is_available()
+        except ImportError:
+            pass
+        return info
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from transcription.models import Transcription
+from transcription.storage import ARCHIVE_FORMATS, archive_audio, delete_audio
+
+
+class Command(BaseCommand):
+    help = 'Archive or delete the audio of old completed transcriptions to reclaim storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=settings.AUDIO_COMPACT_AFTER_DAYS,
+            help='Only touch transcriptions created more than this many days ago'
+        )
+        parser.add_argument(
+            '--policy', choices=['archive', 'delete'], default='archive',
+            help='archive: transcode originals to a compact copy and drop normalized audio; delete: remove all audio'
+        )
+        parser.add_argument(
+            '--format', choices=list(ARCHIVE_FORMATS), default=settings.AUDIO_ARCHIVE_FORMAT,
+            help='Archive format for --policy archive'
+        )
+        parser.add_argument('--limit', type=int, default=None, help='Maximum number of transcriptions to process')
+        parser.add_argument('--dry-run', action='store_true', help='List what would be done without changing anything')
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 0:
+            raise CommandError("--older-than must not be negative")
+
+        cutoff = timezone.now() - timedelta(days=options['older_than'])
+        queryset = Transcription.objects.filter(status='completed', created_at__lt=cutoff)
+        if options['policy'] == 'archive':
+            # Originals not yet tried, plus normalized audio caches to drop
+            to_transcode = Q(audio_storage='original', archive_attempted_at__isnull=True)
+            has_normalized = Q(normalized_audio__isnull=False) & ~Q(normalized_audio='')
+            queryset = queryset.filter(to_transcode | has_normalized)
+        else:
+            queryset = queryset.exclude(audio_storage='deleted')
+        queryset = queryset.order_by('created_at')
+        if options['limit']:
+            queryset = queryset[:options['limit']]
+
+        # Collect the ids up front: the loop updates the columns the queryset filters on
+        ids = list(queryset.values_list('id', flat=True))
+
+        processed = 0
+        failed = 0
+        saved = 0
+        for transcription_id in ids:
+            transcription = Transcription.objects.filter(pk=transcription_id).first()
+            if transcription is None:
+                continue  # Deleted since the ids were collected
+            if options['dry_run']:
+                self.stdout.write(f"Would {options['policy']} audio of transcription {transcription.id}")
+                processed += 1
+                continue
+            try:
+                if options['policy'] == 'archive':
+                    saved += archive_audio(transcription, format=options['format'], keep_normalized=False)
+                else:
+                    saved += delete_audio(transcription)
+                processed += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Transcription {transcription.id}: {str(e)}")
+
+        verb = 'Would process' if options['dry_run'] else 'Processed'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {processed} transcriptions ({failed} failed), "
+            f"saved {saved / (1024 * 1024):.1f}MB"
+        ))
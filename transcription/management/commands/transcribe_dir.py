@@ -0,0 +1,199 @@
+import os
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from transcription.models import Transcription, TranscriptionSegment, SpeakerEmbedding, compute_content_hash
+from transcription.services import TranscriptionService
+from transcription import speakers
+
+logger = logging.getLogger(__name__)
+
+# Models loaded once per worker process by _init_worker
+_worker_service = None
+
+
+def _init_worker():
+    """Process pool initializer: set up Django and load the models once per process."""
+    global _worker_service
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+    _worker_service = TranscriptionService()
+
+
+def _transcribe_path(path, language):
+    """Transcribe one file in a worker process. Never touches the database."""
+    start = time.time()
+    try:
+        result = _worker_service.transcribe_file(path, language=language)
+        return path, result, None, time.time() - start
+    except Exception as e:
+        return path, None, str(e), time.time() - start
+
+
+class Command(BaseCommand):
+    help = 'Transcribe every audio file in a directory using a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Directory to scan for audio files')
+        parser.add_argument(
+            '--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+            help='Number of worker processes, each loading its own models'
+        )
+        parser.add_argument('--language', default=None, help='Language code, auto-detected when omitted')
+        parser.add_argument(
+            '--flush-every', type=int, default=20,
+            help='Number of finished files to write to the database per bulk insert'
+        )
+        parser.add_argument(
+            '--no-recursive', action='store_true',
+            help='Only scan the top level of the directory'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        if not os.path.isdir(directory):
+            raise CommandError(f"Not a directory: {directory}")
+        if options['workers'] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        paths = self.find_audio_files(directory, recursive=not options['no_recursive'])
+        self.stdout.write(f"Found {len(paths)} audio files in {directory}")
+
+        pending = self.skip_transcribed(paths)
+        if not pending:
+            self.stdout.write(self.style.SUCCESS("Nothing to do, all files are already transcribed"))
+            return
+        self.stdout.write(
+            f"Transcribing {len(pending)} files with {options['workers']} workers "
+            f"({len(paths) - len(pending)} skipped)"
+        )
+
+        # Workers never use the database; don't let them inherit open connections
+        connections.close_all()
+
+        language = options['language']
+        buffer = []
+        done = failed = 0
+        audio_seconds = 0.0
+        started = time.time()
+
+        with ProcessPoolExecutor(
+            max_workers=options['workers'],
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker
+        ) as executor:
+            futures = [
+                executor.submit(_transcribe_path, path, language)
+                for path in pending
+            ]
+            for future in as_completed(futures):
+                path, result, error, elapsed = future.result()
+                done += 1
+                if error:
+                    failed += 1
+                    self.stderr.write(f"Failed {path}: {error}")
+                else:
+                    audio_seconds += result['duration']
+
+                buffer.append((path, pending[path], result, error))
+                if len(buffer) >= options['flush_every']:
+                    self.write_results(buffer, language)
+                    buffer = []
+
+                wall = time.time() - started
+                rtf = wall / audio_seconds if audio_seconds else 0.0
+                self.stdout.write(
+                    f"[{done}/{len(pending)}] {os.path.basename(path)} in {elapsed:.1f}s | "
+                    f"{done / wall:.2f} files/s, {audio_seconds / wall:.1f} audio s/s, RTF {rtf:.3f}"
+                )
+
+        if buffer:
+            self.write_results(buffer, language)
+
+        wall = time.time() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Finished {done} files ({failed} failed) in {wall:.1f}s, "
+            f"{audio_seconds:.1f}s of audio, RTF {wall / audio_seconds if audio_seconds else 0.0:.3f}"
+        ))
+
+    def find_audio_files(self, directory, recursive=True):
+        extensions = {f".{ext}" for ext in settings.ALLOWED_AUDIO_EXTENSIONS}
+        paths = []
+        for root, dirs, files in os.walk(directory):
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in extensions:
+                    paths.append(os.path.join(root, name))
+            if not recursive:
+                break
+        return paths
+
+    def skip_transcribed(self, paths):
+        """Hash every file and return {path: hash} for files not transcribed yet."""
+        hashes = {}
+        seen = set()
+        for path in paths:
+            content_hash = compute_content_hash(path)
+            if content_hash in seen:
+                continue  # Duplicate file within the directory
+            seen.add(content_hash)
+            hashes[path] = content_hash
+
+        done = set()
+        values = list(hashes.values())
+        for i in range(0, len(values), 500):  # Keep under SQLite's variable limit
+            done.update(
+                Transcription.objects.filter(
+                    content_hash__in=values[i:i + 500], status='completed'
+                ).values_list('content_hash', flat=True)
+            )
+        return {path: h for path, h in hashes.items() if h not in done}
+
+    def write_results(self, results, language):
+        """Store the audio files and write transcriptions and segments in bulk."""
+        audio_field = Transcription._meta.get_field('audio_file')
+        transcriptions = []
+        for path, content_hash, result, error in results:
+            name = os.path.basename(path)
+            with open(path, 'rb') as f:
+                stored_name = default_storage.save(
+                    audio_field.generate_filename(None, name), File(f, name=name)
+                )
+            transcription = Transcription(
+                audio_file=stored_name,
+                language=language or 'auto',
+                content_hash=content_hash,
+                status='failed' if error else 'completed',
+                error_message=f"Error in transcription: {error}" if error else None,
+                duration=result['duration'] if result else None,
+                num_speakers=result['num_speakers'] if result else None,
+            )
+            if result:
+                transcription.set_timings(result['timings'])
+            transcriptions.append(transcription)
+
+        with transaction.atomic():
+            created = Transcription.objects.bulk_create(transcriptions)
+            segments = []
+            embeddings = []
+            for transcription, (_, _, result, _) in zip(created, results):
+                if result:
+                    segments.extend(TranscriptionService.build_segments(transcription, result['segments']))
+                    embeddings.extend(speakers.build_embeddings(transcription, result.get('speaker_embeddings', {})))
+            TranscriptionSegment.objects.bulk_create(segments, batch_size=500)
+            SpeakerEmbedding.objects.bulk_create(embeddings, batch_size=500)
+
+        # Label voices of enrolled speakers
+        for transcription, (_, _, result, _) in zip(created, results):
+            if result and result.get('speaker_embeddings'):
+                speakers.identify(transcription, result['speaker_embeddings'])
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-19 09:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0002_transcription_duration_transcription_num_speakers_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptionBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(default='auto', max_length=10)),
+                ('total_files', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='transcription',
+            name='batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transcriptions', to='transcription.transcriptionbatch'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 09:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0003_transcriptionbatch_transcription_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcription',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0004_transcription_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcription',
+            name='asr_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='transcription',
+            name='decode_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='transcription',
+            name='diarization_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='transcription',
+            name='persistence_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='transcription',
+            name='processing_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='transcription',
+            name='real_time_factor',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
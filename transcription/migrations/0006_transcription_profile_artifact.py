@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0005_transcription_stage_timings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcription',
+            name='profile_artifact',
+            field=models.FileField(blank=True, null=True, upload_to='profiles/'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0006_transcription_profile_artifact'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='transcriptionsegment',
+            options={'ordering': ['start_time', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='transcriptionsegment',
+            index=models.Index(fields=['transcription', 'start_time', 'id'], name='segment_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transcriptionsegment',
+            index=models.Index(fields=['transcription', 'speaker', 'start_time'], name='segment_speaker_time_idx'),
+        ),
+    ]
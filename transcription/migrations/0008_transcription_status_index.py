@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0007_transcriptionsegment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transcription',
+            index=models.Index(fields=['status', 'created_at'], name='transcription_status_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0008_transcription_status_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcription',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
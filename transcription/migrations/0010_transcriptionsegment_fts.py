@@ -0,0 +1,70 @@
+from django.db import migrations
+
+# External-content FTS5 index over TranscriptionSegment.text. The triggers keep
+# it in sync with every insert, update and delete, including bulk_create.
+FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transcription_segment_fts USING fts5(
+        text,
+        content='transcription_transcriptionsegment',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transcription_segment_fts_ai
+    AFTER INSERT ON transcription_transcriptionsegment BEGIN
+        INSERT INTO transcription_segment_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transcription_segment_fts_ad
+    AFTER DELETE ON transcription_transcriptionsegment BEGIN
+        INSERT INTO transcription_segment_fts(transcription_segment_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transcription_segment_fts_au
+    AFTER UPDATE OF text ON transcription_transcriptionsegment BEGIN
+        INSERT INTO transcription_segment_fts(transcription_segment_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO transcription_segment_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    # Index the segments that already exist
+    "INSERT INTO transcription_segment_fts(transcription_segment_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS transcription_segment_fts_ai",
+    "DROP TRIGGER IF EXISTS transcription_segment_fts_ad",
+    "DROP TRIGGER IF EXISTS transcription_segment_fts_au",
+    "DROP TABLE IF EXISTS transcription_segment_fts",
+]
+
+
+def create_fts(apps, schema_editor):
+    # Other databases fall back to icontains search (see transcription.search)
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in FTS_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0009_transcription_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0010_transcriptionsegment_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcription',
+            name='progress',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
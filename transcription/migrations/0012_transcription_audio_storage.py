@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0011_transcription_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcription',
+            name='archived_audio',
+            field=models.FileField(blank=True, null=True, upload_to='audio_archive/'),
+        ),
+        migrations.AddField(
+            model_name='transcription',
+            name='audio_storage',
+            field=models.CharField(choices=[('original', 'Original upload'), ('archived', 'Compact archive copy'), ('deleted', 'Deleted')], default='original', max_length=10),
+        ),
+    ]
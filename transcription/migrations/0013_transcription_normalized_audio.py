@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0012_transcription_audio_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcription',
+            name='normalized_audio',
+            field=models.FileField(blank=True, null=True, upload_to='normalized/'),
+        ),
+    ]
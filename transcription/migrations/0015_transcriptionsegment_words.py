@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0014_transcription_cancellation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcriptionsegment',
+            name='words',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
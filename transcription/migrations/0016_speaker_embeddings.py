@@ -0,0 +1,44 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0015_transcriptionsegment_words'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrolledSpeaker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('vector', models.BinaryField()),
+                ('num_samples', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SpeakerEmbedding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('speaker', models.CharField(max_length=50)),
+                ('vector', models.BinaryField()),
+                ('similarity', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('enrolled_speaker', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='embeddings', to='transcription.enrolledspeaker')),
+                ('transcription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='speaker_embeddings', to='transcription.transcription')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='speakerembedding',
+            constraint=models.UniqueConstraint(fields=('transcription', 'speaker'), name='speaker_embedding_unique'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0016_speaker_embeddings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcription',
+            name='archive_attempted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,8 +1,11 @@
 from django.db import models
 from django.core.validators import FileExtensionValidator
 import os
+import hashlib
 import logging
 
+from . import wordpack
+
 logger = logging.getLogger(__name__)
 
 def validate_audio_file(value):
@@ -17,18 +20,75 @@ def validate_audio_file(value):
             f"You uploaded: {value.name}"
         )
 
+def compute_content_hash(source):
+    """Return the SHA-256 hex digest of an audio file given as a path or a Django File."""
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+    else:
+        for chunk in source.chunks():
+            digest.update(chunk)
+        source.seek(0)
+    return digest.hexdigest()
+
+class TranscriptionBatch(models.Model):
+    """A group of transcriptions submitted together in one request."""
+    language = models.CharField(max_length=10, default='auto')
+    total_files = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Batch {self.id} ({self.total_files} files)"
+
+    def status_summary(self):
+        """Count member transcriptions per status and derive an overall batch status."""
+        counts = {choice: 0 for choice, _ in Transcription.STATUS_CHOICES}
+        rows = self.transcriptions.order_by().values_list('status').annotate(count=models.Count('id'))
+        for status, count in rows:
+            counts[status] = count
+        total = sum(counts.values())
+        # Timed out jobs are finished and unsuccessful, like failed ones
+        failures = counts['failed'] + counts['timed_out']
+
+        if total and counts['pending'] == total:
+            overall = 'pending'
+        elif counts['pending'] + counts['processing'] > 0:
+            overall = 'processing'
+        elif total and counts['cancelled'] == total:
+            overall = 'cancelled'
+        elif total and failures and not counts['completed']:
+            overall = 'failed'
+        else:
+            overall = 'completed'
+
+        return {'status': overall, 'total': total, **counts, 'failures': failures}
+
 class Transcription(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('processing', 'Processing'),
         ('completed', 'Completed'),
         ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+        ('timed_out', 'Timed out'),
     ]
 
     audio_file = models.FileField(
         upload_to='audio_files/',
         validators=[FileExtensionValidator(allowed_extensions=['wav', 'mp3', 'm4a', 'ogg'])]
     )
+    AUDIO_STORAGE_CHOICES = [
+        ('original', 'Original upload'),
+        ('archived', 'Compact archive copy'),
+        ('deleted', 'Deleted'),
+    ]
+    audio_storage = models.CharField(max_length=10, choices=AUDIO_STORAGE_CHOICES, default='original')
+    archived_audio = models.FileField(upload_to='audio_archive/', null=True, blank=True)  # 16kHz mono FLAC/Opus
+    archive_attempted_at = models.DateTimeField(null=True, blank=True)  # Archive copy was not smaller, original kept
+    normalized_audio = models.FileField(upload_to='normalized/', null=True, blank=True)  # Raw 16kHz mono samples
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -36,10 +96,78 @@ class Transcription(models.Model):
     language = models.CharField(max_length=10, default='en-US')
     num_speakers = models.IntegerField(null=True, blank=True)
     duration = models.FloatField(null=True, blank=True)  # Duration in seconds
+    batch = models.ForeignKey(
+        TranscriptionBatch,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='transcriptions'
+    )
+    content_hash = models.CharField(max_length=64, null=True, blank=True, db_index=True)  # SHA-256 of the uploaded file
+
+    # Per-stage processing times in seconds
+    decode_seconds = models.FloatField(null=True, blank=True)
+    diarization_seconds = models.FloatField(null=True, blank=True)
+    asr_seconds = models.FloatField(null=True, blank=True)
+    persistence_seconds = models.FloatField(null=True, blank=True)
+    processing_seconds = models.FloatField(null=True, blank=True)  # Total wall-clock time
+    real_time_factor = models.FloatField(null=True, blank=True)  # processing_seconds / duration
+    profile_artifact = models.FileField(upload_to='profiles/', null=True, blank=True)  # Zip of profiler output
+    cancel_requested = models.BooleanField(default=False)  # Checked by the running job between turns
+    progress = models.FloatField(default=0.0)  # Fraction of speaker turns transcribed
+    version = models.PositiveIntegerField(default=1)  # Bumped whenever segments or speaker labels change
+
+    TIMING_FIELDS = ['decode_seconds', 'diarization_seconds', 'asr_seconds', 'persistence_seconds']
+
+    class Meta:
+        indexes = [
+            # Listing jobs filtered by status, newest first
+            models.Index(fields=['status', 'created_at'], name='transcription_status_idx'),
+        ]
 
     def __str__(self):
         return f"Transcription {self.id} - {self.status}"
 
+    @property
+    def audio_path(self):
+        """Local path of the audio to process: the original upload, else its archive copy."""
+        if self.audio_file:
+            return self.audio_file.path
+        if self.archived_audio:
+            return self.archived_audio.path
+        return None
+
+    @classmethod
+    def bump_version(cls, pk):
+        """Invalidate cached renderings of a transcript after its segments changed."""
+        cls.objects.filter(pk=pk).update(version=models.F('version') + 1)
+
+    def etag(self, variant):
+        """Strong ETag for a rendering of this transcript at its current version."""
+        return f'"t{self.pk}-v{self.version}-{variant}"'
+
+    def label_speaker(self, speaker, label):
+        """Set the human-readable label of one speaker on all its segments."""
+        updated = self.segments.filter(speaker=speaker).update(speaker_label=label)
+        if updated:
+            Transcription.bump_version(self.pk)
+        return updated
+
+    def set_timings(self, timings):
+        """Store per-stage timings in seconds, keyed by stage name ('decode', 'asr', ...).
+
+        processing_seconds falls back to the sum of the stages when no
+        'processing' entry is given; the real-time factor is derived from it.
+        """
+        for stage, seconds in timings.items():
+            setattr(self, f"{stage}_seconds", seconds)
+        if 'processing' not in timings:
+            self.processing_seconds = sum(
+                getattr(self, field) or 0.0 for field in self.TIMING_FIELDS
+            )
+        if self.duration:
+            self.real_time_factor = self.processing_seconds / self.duration
+
     def clean(self):
         """Additional validation before saving"""
         super().clean()
@@ -59,9 +187,56 @@ class TranscriptionSegment(models.Model):
     end_time = models.FloatField()    # End time in seconds
     confidence = models.FloatField(null=True, blank=True)  # Confidence score for this segment
     language = models.CharField(max_length=10, null=True, blank=True)  # Language of this segment
+    # Word-level timings packed by transcription.wordpack, decoded only on request
+    words = models.BinaryField(null=True, blank=True, editable=False)
 
     class Meta:
-        ordering = ['start_time']
+        ordering = ['start_time', 'id']
+        indexes = [
+            # Time-window reads and keyset pagination within one transcription
+            models.Index(fields=['transcription', 'start_time', 'id'], name='segment_time_idx'),
+            models.Index(fields=['transcription', 'speaker', 'start_time'], name='segment_speaker_time_idx'),
+        ]
 
     def __str__(self):
         return f"{self.speaker} ({self.start_time:.2f}-{self.end_time:.2f}): {self.text[:50]}..."
+
+    @property
+    def word_timings(self):
+        """Decoded word-level timings with absolute start and end times."""
+        return wordpack.unpack(self.words, self.start_time)
+
+
+class EnrolledSpeaker(models.Model):
+    """A known person. New recordings are matched against the mean of its enrolled embeddings."""
+    name = models.CharField(max_length=50, unique=True)  # Applied as speaker_label on matching segments
+    vector = models.BinaryField()  # Unit-length float32 mean embedding (see transcription.speakers)
+    num_samples = models.PositiveIntegerField(default=0)  # Embeddings averaged into vector
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class SpeakerEmbedding(models.Model):
+    """Voice embedding of one diarized speaker in one transcription."""
+    transcription = models.ForeignKey(Transcription, on_delete=models.CASCADE, related_name='speaker_embeddings')
+    speaker = models.CharField(max_length=50)  # Per-file identifier, as on the segments
+    vector = models.BinaryField()  # float32 embedding from the diarization backend
+    enrolled_speaker = models.ForeignKey(
+        EnrolledSpeaker, on_delete=models.SET_NULL, null=True, blank=True, related_name='embeddings'
+    )  # Enrolled speaker this voice was matched to or enrolled as
+    similarity = models.FloatField(null=True, blank=True)  # Cosine similarity of the match
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['transcription', 'speaker'], name='speaker_embedding_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.speaker} in transcription {self.transcription_id}"
@@ -0,0 +1,24 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class SegmentCursorPagination(CursorPagination):
+    """Keyset pagination over a transcription's segments in time order.
+
+    The cursor encodes the last start_time seen, so each page is an index
+    range scan on (transcription, start_time, id) no matter how deep the
+    client has paged.
+    """
+
+    ordering = ('start_time', 'id')
+    page_size = settings.SEGMENT_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.SEGMENT_MAX_PAGE_SIZE
+
+
+class TranscriptionPagination(PageNumberPagination):
+    """Page-numbered listing of transcriptions."""
+
+    page_size = settings.TRANSCRIPTION_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.TRANSCRIPTION_MAX_PAGE_SIZE
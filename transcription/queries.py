@@ -0,0 +1,148 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Transcription, TranscriptionSegment
+
+logger = logging.getLogger(__name__)
+
+
+# Fields of a segment in API responses, matching TranscriptionSegmentSerializer
+SEGMENT_FIELDS = ('speaker', 'text', 'start_time', 'end_time', 'confidence')
+
+
+class TranscriptQueryService:
+    """Read and render stored transcriptions.
+
+    Everything here works from the database alone and never touches the
+    inference backends, so API nodes that only serve results can use it
+    without loading any models. Running jobs goes through TranscriptionService.
+    """
+
+    FORMATS = ('text', 'json')
+
+    def get_transcription_text(self, transcription_id, format='text'):
+        """Get formatted transcription text with speaker information.
+
+        Args:
+            transcription_id: ID of the transcription
+            format: Output format ('text' or 'json')
+        """
+        try:
+            transcription = Transcription.objects.get(id=transcription_id)
+            # Stream plain rows in index order instead of materializing model instances
+            segments = TranscriptionSegment.objects.filter(
+                transcription=transcription
+            ).order_by('start_time', 'id').values(
+                'speaker', 'start_time', 'end_time', 'text', 'confidence', 'language'
+            ).iterator(chunk_size=2000)
+
+            if format == 'json':
+                # Return structured JSON format
+                return {
+                    'id': transcription.id,
+                    'status': transcription.status,
+                    'duration': transcription.duration,
+                    'num_speakers': transcription.num_speakers,
+                    'language': transcription.language,
+                    'segments': list(segments)
+                }
+            else:
+                # Return formatted text
+                formatted_text = []
+                for segment in segments:
+                    timestamp = f"[{segment['start_time']:.2f}-{segment['end_time']:.2f}]"
+                    speaker = segment['speaker']
+                    text = segment['text']
+                    formatted_text.append(f"{timestamp} {speaker}: {text}")
+
+                return "\n".join(formatted_text)
+
+        except Exception as e:
+            error_msg = f"Error getting transcription text: {str(e)}"
+            logger.error(error_msg)
+            raise Exception(error_msg)
+
+    def render(self, transcription, format='text'):
+        """Response body of the text action for `transcription`.
+
+        Completed transcripts are cached per version, so a new version (after
+        a reprocess or a segment edit) is rendered afresh.
+        """
+        cacheable = transcription.status == 'completed'
+        cache_key = f"transcript:{transcription.pk}:{transcription.version}:{format}"
+        body = cache.get(cache_key) if cacheable else None
+        if body is not None:
+            return body
+
+        result = self.get_transcription_text(transcription.id, format=format)
+        if format == 'json':
+            body = result
+        else:
+            body = {
+                "transcription_id": transcription.id,
+                "status": transcription.status,
+                "text": result,
+                "duration": transcription.duration,
+                "num_speakers": transcription.num_speakers,
+                "language": transcription.language
+            }
+        if cacheable:
+            cache.set(cache_key, body, settings.TRANSCRIPT_CACHE_TIMEOUT)
+        return body
+
+    def segment_payloads(self, segments):
+        """Response dicts for a segment queryset, built from value tuples.
+
+        Skips model instances and per-row serializer fields, which dominate the
+        response time of long transcripts.
+        """
+        return [dict(zip(SEGMENT_FIELDS, row)) for row in segments.values_list(*SEGMENT_FIELDS)]
+
+    def segments_by_transcription(self, transcription_ids):
+        """Segment payloads of several transcriptions in one query, keyed by transcription id."""
+        payloads = {pk: [] for pk in transcription_ids}
+        rows = TranscriptionSegment.objects.filter(
+            transcription_id__in=transcription_ids
+        ).order_by('transcription_id', 'start_time', 'id').values_list('transcription_id', *SEGMENT_FIELDS)
+        for transcription_id, *values in rows.iterator(chunk_size=2000):
+            payloads[transcription_id].append(dict(zip(SEGMENT_FIELDS, values)))
+        return payloads
+
+    def get_status(self, transcription):
+        """Status, progress and stage timings of a transcription."""
+        return {
+            "id": transcription.id,
+            "status": transcription.status,
+            "duration": transcription.duration,
+            "num_speakers": transcription.num_speakers,
+            "language": transcription.language,
+            "created_at": transcription.created_at,
+            "updated_at": transcription.updated_at,
+            "error_message": transcription.error_message,
+            "progress": transcription.progress,
+            "cancel_requested": transcription.cancel_requested,
+            "timings": {
+                "decode": transcription.decode_seconds,
+                "diarization": transcription.diarization_seconds,
+                "asr": transcription.asr_seconds,
+                "persistence": transcription.persistence_seconds,
+                "processing": transcription.processing_seconds
+            },
+            "real_time_factor": transcription.real_time_factor
+        }
+
+    def filter_segments(self, transcription, start=None, end=None, speaker=None):
+        """Segments of a transcription overlapping [start, end), optionally of one speaker.
+
+        Raises ValueError if start or end is not a number.
+        """
+        segments = TranscriptionSegment.objects.filter(transcription=transcription)
+        if start is not None:
+            segments = segments.filter(end_time__gt=float(start))
+        if end is not None:
+            segments = segments.filter(start_time__lt=float(end))
+        if speaker:
+            segments = segments.filter(speaker=speaker)
+        return segments
@@ -0,0 +1,116 @@
+import re
+import logging
+
+from django.db import connection, DatabaseError
+
+from .models import TranscriptionSegment
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'transcription_segment_fts'
+RESULT_FIELDS = [
+    'id', 'transcription_id', 'speaker', 'speaker_label', 'start_time', 'end_time', 'text', 'snippet', 'rank'
+]
+
+
+def fts_query(query):
+    """Turn free text into an FTS5 query that matches all terms.
+
+    Every term is quoted so user input cannot inject FTS5 syntax; a trailing
+    '*' on a term is kept as a prefix match.
+    """
+    terms = []
+    for term in query.split():
+        prefix = term.endswith('*')
+        term = term.rstrip('*').replace('"', '""')
+        if re.search(r'\w', term):
+            terms.append(f'"{term}"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+class SegmentSearch:
+    """Lazy, sliceable search results for use with DRF/Django paginators.
+
+    Uses the SQLite FTS5 index ranked by bm25 when available and falls back
+    to an unranked icontains scan on other databases.
+    """
+
+    def __init__(self, query, transcription_id=None):
+        self.query = query
+        self.transcription_id = transcription_id
+        self.match = fts_query(query)
+        self.use_fts = connection.vendor == 'sqlite' and fts_available()
+        self._count = None
+
+    def _where(self):
+        sql = f"{FTS_TABLE} MATCH %s"
+        params = [self.match]
+        if self.transcription_id is not None:
+            sql += " AND s.transcription_id = %s"
+            params.append(self.transcription_id)
+        return sql, params
+
+    def _fallback_queryset(self):
+        queryset = TranscriptionSegment.objects.filter(text__icontains=self.query.strip())
+        if self.transcription_id is not None:
+            queryset = queryset.filter(transcription_id=self.transcription_id)
+        return queryset.order_by('transcription_id', 'start_time', 'id')
+
+    def count(self):
+        if self._count is None:
+            if not self.match:
+                self._count = 0
+            elif self.use_fts:
+                where, params = self._where()
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT COUNT(*) FROM {FTS_TABLE} "
+                        f"JOIN {TranscriptionSegment._meta.db_table} s ON s.id = {FTS_TABLE}.rowid "
+                        f"WHERE {where}",
+                        params
+                    )
+                    self._count = cursor.fetchone()[0]
+            else:
+                self._count = self._fallback_queryset().count()
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        offset = item.start or 0
+        limit = (item.stop - offset) if item.stop is not None else -1
+        if not self.match or limit == 0:
+            return []
+
+        if not self.use_fts:
+            rows = self._fallback_queryset().values(
+                'id', 'transcription_id', 'speaker', 'speaker_label', 'start_time', 'end_time', 'text'
+            )
+            end = None if limit < 0 else offset + limit
+            return [{**row, 'snippet': row['text'], 'rank': None} for row in rows[offset:end]]
+
+        where, params = self._where()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT s.id, s.transcription_id, s.speaker, s.speaker_label, s.start_time, s.end_time, s.text, "
+                f"snippet({FTS_TABLE}, 0, '<b>', '</b>', '…', 16), bm25({FTS_TABLE}) AS rank "
+                f"FROM {FTS_TABLE} "
+                f"JOIN {TranscriptionSegment._meta.db_table} s ON s.id = {FTS_TABLE}.rowid "
+                f"WHERE {where} ORDER BY rank LIMIT %s OFFSET %s",
+                params + [limit, offset]
+            )
+            return [dict(zip(RESULT_FIELDS, row)) for row in cursor.fetchall()]
+
+
+def fts_available():
+    """True if the FTS5 table exists on the current SQLite database."""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            return cursor.fetchone() is not None
+    except DatabaseError as e:
+        logger.warning(f"Full-text search unavailable, using icontains: {str(e)}")
+        return False
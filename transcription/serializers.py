@@ -1,20 +1,71 @@
 from rest_framework import serializers
-from .models import Transcription, TranscriptionSegment
+from .models import Transcription, TranscriptionBatch, TranscriptionSegment, EnrolledSpeaker
+from .queries import TranscriptQueryService
 
 class TranscriptionSegmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = TranscriptionSegment
         fields = ['speaker', 'text', 'start_time', 'end_time', 'confidence']
 
+class SegmentPayloadField(serializers.Field):
+    """Read-only nested segments built from value tuples instead of a nested serializer.
+
+    Uses the payloads the view put in the context under 'segment_payloads'
+    (one query for a whole page) and queries per transcription otherwise.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, transcription):
+        payloads = self.context.get('segment_payloads')
+        if payloads is not None and transcription.pk in payloads:
+            return payloads[transcription.pk]
+        return TranscriptQueryService().segment_payloads(transcription.segments.all())
+
 class TranscriptionSerializer(serializers.ModelSerializer):
-    segments = TranscriptionSegmentSerializer(many=True, read_only=True)
+    segments = SegmentPayloadField()
+
+    class Meta:
+        model = Transcription
+        fields = ['id', 'audio_file', 'audio_storage', 'language', 'status', 'created_at', 'segments', 'error_message']
+        read_only_fields = ['id', 'audio_storage', 'status', 'created_at', 'segments', 'error_message']
+
+class TranscriptionListSerializer(serializers.ModelSerializer):
+    """Lightweight listing representation; segment_count comes from a queryset annotation."""
+    segment_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Transcription
-        fields = ['id', 'audio_file', 'language', 'status', 'created_at', 'segments', 'error_message']
-        read_only_fields = ['id', 'status', 'created_at', 'segments', 'error_message']
+        fields = [
+            'id', 'audio_file', 'audio_storage', 'language', 'status', 'duration', 'num_speakers',
+            'segment_count', 'created_at', 'error_message'
+        ]
+        read_only_fields = fields
 
 class TranscriptionCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Transcription
-        fields = ['audio_file', 'language'] 
\ No newline at end of file
+        fields = ['audio_file', 'language']
+
+class TranscriptionBatchSerializer(serializers.ModelSerializer):
+    summary = serializers.SerializerMethodField()
+    transcription_ids = serializers.PrimaryKeyRelatedField(
+        source='transcriptions', many=True, read_only=True
+    )
+
+    class Meta:
+        model = TranscriptionBatch
+        fields = ['id', 'language', 'total_files', 'created_at', 'updated_at', 'summary', 'transcription_ids']
+        read_only_fields = fields
+
+    def get_summary(self, obj):
+        return obj.status_summary()
+
+class EnrolledSpeakerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EnrolledSpeaker
+        fields = ['id', 'name', 'num_samples', 'created_at', 'updated_at']
+        read_only_fields = fields
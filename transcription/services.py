@@ -1,157 +1,71 @@
 import os
 import logging
 import time
+import threading
 import traceback
-import torch
-import torchaudio
+import numpy as np
 from django.conf import settings
-from pyannote.audio import Pipeline
-from pyannote.core import Segment
-import whisper
+from django.db.models import F
+from django.utils import timezone
+from audio_blog_project import metrics, profiling
+from audio_blog_project.backends import get_backend, release_accelerator_memory
+from audio_blog_project.residency import residency
+from audio_blog_project.memory import memory_budget, MemoryBudgetExceeded, MB
 from .models import Transcription, TranscriptionSegment
-import huggingface_hub
-import tempfile
-import shutil
-from huggingface_hub import snapshot_download, HfFolder
-import requests
-from requests.exceptions import RequestException
-import concurrent.futures
+from .writer import db_writer
+from .queries import TranscriptQueryService
+from . import audio, speakers, storage, wordpack
+from .control import JobControl, JobStopped, JobCancelled
+from .fanout import ASRWorkerPool
 import atexit
-import gc
 import json
+import wave
 
 logger = logging.getLogger(__name__)
 
 class TranscriptionService:
     _instance = None
     _initialized = False
+    # Guards creation and model loading, so concurrent first requests load the models once
+    _lock = threading.Lock()
     
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(TranscriptionService, cls).__new__(cls)
-        return cls._instance
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(TranscriptionService, cls).__new__(cls)
+            return cls._instance
     
     def __init__(self):
         if TranscriptionService._initialized:
             logger.info("TranscriptionService already initialized, skipping initialization")
             return
-            
+
+        with TranscriptionService._lock:
+            # Another thread may have finished loading while this one waited
+            if TranscriptionService._initialized:
+                return
+            self._load_models()
+
+    def _load_models(self):
         try:
             logger.info("Initializing TranscriptionService...")
-            
-            # Create cache directory
-            cache_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'model_cache')
-            os.makedirs(cache_dir, exist_ok=True)
-            logger.info(f"Created cache directory at: {cache_dir}")
-            
-            # Configure Hugging Face cache paths
-            os.environ['HF_HOME'] = cache_dir
-            os.environ['TRANSFORMERS_CACHE'] = os.path.join(cache_dir, 'transformers')
-            os.environ['HF_DATASETS_CACHE'] = os.path.join(cache_dir, 'datasets')
-            logger.info("Configured Hugging Face cache paths")
-            
-            # Verify token before proceeding
-            token = settings.PYANNOTE_AUTH_TOKEN
-            if not token:
-                raise ValueError("PYANNOTE_AUTH_TOKEN not set in settings")
-            
-            # Test token with Hugging Face API
-            headers = {"Authorization": f"Bearer {token}"}
-            response = requests.get(
-                "https://huggingface.co/api/whoami",
-                headers=headers,
-                timeout=10
-            )
-            if response.status_code != 200:
-                error_msg = f"Token verification failed with {response.status_code} {response.reason}"
-                logger.error(error_msg)
-                logger.error(f"Response content: {response.text}")
-                raise ValueError(f"Invalid or expired Hugging Face token. Please check your token and ensure it has the correct permissions.")
-            
-            # Set token in HfFolder for all Hugging Face operations
-            HfFolder.save_token(token)
-            logger.info("Token verified and set in HfFolder")
-            
-            # Initialize Whisper model
-            logger.info("Initializing Whisper model...")
-            try:
-                # Force garbage collection before loading model
-                gc.collect()
-                torch.cuda.empty_cache() if torch.cuda.is_available() else None
-                
-                # Create a temporary directory for model download
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    model_path = os.path.join(temp_dir, 'base.pt')
-                    self.whisper_model = whisper.load_model(
-                        "base",
-                        download_root=temp_dir,
-                        device='cuda' if torch.cuda.is_available() else 'cpu'
-                    )
-                    # Move the model to the final location
-                    final_path = os.path.join(cache_dir, 'whisper', 'base.pt')
-                    os.makedirs(os.path.dirname(final_path), exist_ok=True)
-                    shutil.move(model_path, final_path)
-                logger.info("Whisper model initialized successfully")
-            except Exception as e:
-                logger.error(f"Error initializing Whisper model: {str(e)}")
-                raise
-            
-            # Initialize diarization pipeline
-            logger.info("Initializing diarization pipeline...")
-            try:
-                # Set timeout for requests
-                huggingface_hub.constants.HF_HUB_DOWNLOAD_TIMEOUT = 300  # 5 minutes
-                
-                # Download model files with timeout
-                logger.info("Downloading model files...")
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(
-                        snapshot_download,
-                        "pyannote/speaker-diarization-3.1",
-                        use_auth_token=token,
-                        cache_dir=os.path.join(cache_dir, 'pyannote'),
-                        local_files_only=False
-                    )
-                    try:
-                        model_path = future.result(timeout=300)  # 5 minutes timeout
-                        logger.info(f"Model files downloaded to: {model_path}")
-                    except concurrent.futures.TimeoutError:
-                        raise Exception("Model download timed out after 5 minutes")
-                    except Exception as e:
-                        if "401" in str(e):
-                            raise Exception("Invalid or expired Hugging Face token. Please check your token and ensure it has the correct permissions.")
-                        raise Exception(f"Model download failed: {str(e)}")
-                
-                # Initialize the pipeline with the downloaded model
-                logger.info("Loading pipeline from downloaded model...")
-                self.diarization_pipeline = Pipeline.from_pretrained(
-                    model_path,
-                    use_auth_token=token
-                )
-                
-                # Test the pipeline with a dummy input
-                logger.info("Testing pipeline initialization...")
-                dummy_waveform = torch.zeros((1, 16000))  # 1 second of silence
-                dummy_sample_rate = 16000
-                test_result = self.diarization_pipeline(
-                    {"waveform": dummy_waveform, "sample_rate": dummy_sample_rate},
-                    min_speakers=1,
-                    max_speakers=2
-                )
-                logger.info("Pipeline test successful")
-                
-            except Exception as e:
-                logger.error(f"Error initializing diarization pipeline: {str(e)}\n{traceback.format_exc()}")
-                if "401" in str(e):
-                    raise Exception("Invalid or expired Hugging Face token. Please check your token and ensure it has the correct permissions.")
-                raise Exception(f"Diarization pipeline initialization failed: {str(e)}")
-            
-            # Move models to GPU if available
-            if torch.cuda.is_available():
-                logger.info("Using GPU for models")
-                self.diarization_pipeline = self.diarization_pipeline.to(torch.device("cuda"))
+
+            # Backends are selected in settings.INFERENCE_BACKENDS. They are
+            # loaded now and may be unloaded while idle (see ModelResidency).
+            self.diarizer = residency.register('diarization', get_backend('diarization'))
+            if settings.ASR_WORKERS:
+                # ASR runs only in the worker processes (see transcribe_turns_parallel),
+                # so no ASR model is loaded in this one
+                self.asr_pool = residency.register('asr_pool', ASRWorkerPool(settings.ASR_WORKERS))
+                self.asr = None
+                self.fast_asr = None
             else:
-                logger.info("Using CPU for models")
+                self.asr_pool = None
+                self.asr = residency.register('asr', get_backend('asr'))
+                # In cascade mode every turn goes to a small model first (see transcribe_turn)
+                self.fast_asr = residency.register('asr_fast', get_backend('asr_fast')) if settings.ASR_CASCADE else None
+
+            self.ensure_models_loaded()
             
             logger.info("All models initialized successfully")
             TranscriptionService._initialized = True
@@ -162,186 +76,408 @@ class TranscriptionService:
         except Exception as e:
             error_msg = f"Error loading models: {str(e)}"
             logger.error(error_msg)
-            if "401" in str(e):
-                error_msg += "\nPlease make sure you have:\n1. Accepted the terms of use at https://huggingface.co/pyannote/speaker-diarization-3.1\n2. Accepted the terms of use at https://huggingface.co/pyannote/segmentation-3.1\n3. Accepted the terms of use at https://huggingface.co/pyannote/embedding-3.1\n4. Enabled 'Access to public gated repositories' in your Hugging Face token settings"
             raise Exception(error_msg)
 
+    def ensure_models_loaded(self):
+        """Load the models a job needs if they were unloaded while idle.
+
+        Jobs call this before taking their memory reservation, so a reload is
+        admitted against the budget on its own.
+        """
+        for model in (self.asr, self.diarizer, self.fast_asr, self.asr_pool):
+            if model is not None:
+                model.load()
+
     def cleanup(self):
         """Cleanup function to be called when the service is destroyed."""
         try:
             logger.info("Cleaning up resources...")
-            # Force garbage collection
-            gc.collect()
-            torch.cuda.empty_cache() if torch.cuda.is_available() else None
             
-            # Clear model references
-            self.whisper_model = None
-            self.diarization_pipeline = None
+            # Unload the models and clear the references
+            for model in (self.asr, self.fast_asr, self.asr_pool, self.diarizer):
+                if model is not None:
+                    model.unload('shutdown')
+            self.asr = None
+            self.fast_asr = None
+            self.asr_pool = None
+            self.diarizer = None
+
+            # Force garbage collection
+            release_accelerator_memory()
             
             # Reset initialization flag
-            TranscriptionService._initialized = False
-            TranscriptionService._instance = None
+            with TranscriptionService._lock:
+                TranscriptionService._initialized = False
+                TranscriptionService._instance = None
             
             logger.info("Cleanup completed")
         except Exception as e:
             logger.error(f"Error during cleanup: {str(e)}")
 
-    def perform_diarization(self, audio_path, min_speakers=1, max_speakers=2):
-        """Perform speaker diarization on the audio file."""
+    # Sample rate expected by both the diarization pipeline and Whisper
+    SAMPLE_RATE = audio.SAMPLE_RATE
+
+    def probe_duration(self, audio_path, normalized_path=None):
+        """Read the audio duration from the file header without decoding the samples."""
+        if normalized_path and os.path.exists(normalized_path):
+            return audio.normalized_duration(normalized_path)
         try:
-            logger.info(f"Starting diarization for {audio_path}")
-            
-            # Load audio file
-            waveform, sample_rate = torchaudio.load(audio_path)
-            
-            # Convert to mono if stereo
-            if waveform.shape[0] > 1:
-                waveform = torch.mean(waveform, dim=0, keepdim=True)
-            
-            # Resample to 16kHz if necessary (required by the model)
-            if sample_rate != 16000:
-                resampler = torchaudio.transforms.Resample(sample_rate, 16000)
-                waveform = resampler(waveform)
-                sample_rate = 16000
-            
-            logger.info("Running diarization pipeline...")
-            diarization = self.diarization_pipeline(
-                {"waveform": waveform, "sample_rate": sample_rate},
-                min_speakers=min_speakers,
-                max_speakers=max_speakers,
-                min_duration_on=0.5,
-                min_duration_off=0.5
-            )
+            import torchaudio
+            info = torchaudio.info(audio_path)
+            return info.num_frames / info.sample_rate
+        except Exception:
+            pass
+        try:
+            import soundfile
+            info = soundfile.info(audio_path)
+            return info.frames / info.samplerate
+        except Exception:
+            pass
+        try:
+            with wave.open(audio_path, 'rb') as f:
+                return f.getnframes() / f.getframerate()
+        except Exception:
+            # Unknown header: assume typical 128kbps compressed audio
+            return os.path.getsize(audio_path) / 16000.0
+
+    def estimate_memory(self, duration):
+        """Projected extra memory in bytes for transcribing `duration` seconds of audio."""
+        return int(duration * settings.MEMORY_PER_AUDIO_SECOND_MB * MB)
+
+    def load_audio(self, audio_path):
+        """Decode an audio file into a (channels, samples) waveform at its native rate."""
+        return audio.load_audio(audio_path)
+
+    def prepare_waveform(self, waveform, sample_rate):
+        """Downmix to mono and resample to 16kHz (required by the models)."""
+        return audio.prepare_waveform(waveform, sample_rate)
+
+    def load_waveform(self, audio_path, normalized_path=None):
+        """Return the prepared 16kHz mono waveform of an audio file.
+
+        When normalized_path exists it is memory-mapped instead of decoding the
+        audio again; otherwise the decoded waveform is written there first, so
+        later runs (reprocessing, archiving) skip decoding.
+        """
+        if normalized_path and os.path.exists(normalized_path):
+            return audio.open_normalized(normalized_path)
+
+        waveform = self.prepare_waveform(*self.load_audio(audio_path))
+        if normalized_path:
+            audio.write_normalized(waveform, normalized_path)
+            # Reading through the page cache lets the decoded buffer be freed
+            return audio.open_normalized(normalized_path)
+        return waveform
+
+    def diarize(self, waveform, min_speakers=1, max_speakers=2, return_embeddings=False):
+        """Split a prepared 16kHz mono waveform into (start, end, speaker) turns.
+
+        With return_embeddings=True returns (turns, {speaker: embedding}).
+        """
+        try:
+            logger.info("Running diarization...")
+            with self.diarizer.use() as diarizer:
+                result = diarizer.diarize(
+                    waveform,
+                    min_speakers=min_speakers,
+                    max_speakers=max_speakers,
+                    return_embeddings=return_embeddings
+                )
             logger.info("Diarization completed successfully")
-            return diarization
-                    
+            return result
+
         except Exception as e:
             error_msg = f"Error in diarization: {str(e)}"
             logger.error(error_msg)
             raise Exception(error_msg)
 
-    def transcribe_audio(self, audio_path, transcription_id, language=None):
-        """Transcribe audio file with speaker diarization."""
+    def perform_diarization(self, audio_path, min_speakers=1, max_speakers=2):
+        """Perform speaker diarization on the audio file."""
+        logger.info(f"Starting diarization for {audio_path}")
+        waveform, sample_rate = self.load_audio(audio_path)
+        waveform = self.prepare_waveform(waveform, sample_rate)
+        return self.diarize(waveform, min_speakers=min_speakers, max_speakers=max_speakers)
+
+    @staticmethod
+    def segment_speaker(speaker):
+        """Speaker identifier stored on segments for a diarization label."""
+        return f"SPEAKER_{speaker.split('_')[-1]}"
+
+    def transcribe_turn(self, waveform, start, end, speaker, language=None):
+        """Transcribe one diarized turn of a prepared 16kHz mono waveform.
+
+        The slice is handed to the ASR backend as an in-memory float32 array, so
+        no temporary file or ffmpeg round trip is needed per turn. In cascade
+        mode (settings.ASR_CASCADE) the turn is first decoded by the fast model
+        and re-decoded by the main model only when the fast result's confidence
+        is below settings.ASR_CASCADE_THRESHOLD.
+        """
+        segment_audio = np.asarray(waveform[0, int(start * self.SAMPLE_RATE):int(end * self.SAMPLE_RATE)])
+        word_timestamps = settings.WORD_TIMESTAMPS
+        if self.fast_asr is None:
+            with self.asr.use() as asr:
+                result = asr.transcribe(segment_audio, language=language, word_timestamps=word_timestamps)
+        else:
+            with self.fast_asr.use() as fast_asr:
+                result = fast_asr.transcribe(segment_audio, language=language, word_timestamps=word_timestamps)
+            if result['confidence'] < settings.ASR_CASCADE_THRESHOLD:
+                with self.asr.use() as asr:
+                    result = asr.transcribe(segment_audio, language=language, word_timestamps=word_timestamps)
+                metrics.ASR_CASCADE_TURNS.inc(decoded_by='main')
+            else:
+                metrics.ASR_CASCADE_TURNS.inc(decoded_by='fast')
+        return self.turn_segment(start, end, speaker, result)
+
+    def turn_segment(self, start, end, speaker, result):
+        """Segment fields for one turn from an ASR backend result."""
+        return {
+            'start_time': start,
+            'end_time': end,
+            'text': result['text'],
+            'confidence': result['confidence'],
+            'speaker': self.segment_speaker(speaker),
+            'language': result['language'],
+            # Word times are relative to the turn, which is also how they are packed
+            'words': wordpack.pack(result.get('words')),
+        }
+
+    def transcribe_turns_parallel(self, waveform, turns, language=None, checkpoint=None, progress=None):
+        """Transcribe turns in the ASR worker processes; segments come back in turn order."""
+        with self.asr_pool.use() as pool:
+            results = pool.transcribe_turns(
+                waveform, turns,
+                language=language,
+                word_timestamps=settings.WORD_TIMESTAMPS,
+                checkpoint=checkpoint,
+                progress=progress
+            )
+        segments = []
+        for (start, end, speaker), result in zip(turns, results):
+            if result.get('decoded_by'):
+                metrics.ASR_CASCADE_TURNS.inc(decoded_by=result['decoded_by'])
+            segments.append(self.turn_segment(start, end, speaker, result))
+        return segments
+
+    def transcribe_file(self, audio_path, language=None, checkpoint=None, progress=None, normalized_path=None):
+        """Run diarization and ASR on an audio file without touching the database.
+
+        Args:
+            audio_path: Path to the audio file
+            language: Optional language code, auto-detected when None
+            checkpoint: Optional callable run between stages and turns; it may
+                raise to stop the job (e.g. Reservation.check)
+            progress: Optional callable receiving the fraction of turns transcribed
+            normalized_path: Optional raw 16kHz mono file to read instead of
+                decoding audio_path, created on first use (see load_waveform)
+
+        Returns:
+            dict: duration, num_speakers, the list of segment fields ordered by
+            start time, speaker_embeddings keyed by segment speaker and
+            per-stage timings in seconds
+        """
+        logger.info(f"Starting transcription for {audio_path}")
+        timings = {}
+        checkpoint = checkpoint or (lambda: None)
+
+        # Decode once and share the prepared waveform between diarization and ASR
+        with metrics.timed(timings, 'decode'):
+            waveform = self.load_waveform(audio_path, normalized_path)
+            duration = waveform.shape[1] / self.SAMPLE_RATE
+
+        checkpoint()
+        with metrics.timed(timings, 'diarization'):
+            if settings.SPEAKER_EMBEDDINGS:
+                turns, embeddings = self.diarize(waveform, return_embeddings=True)
+            else:
+                turns, embeddings = self.diarize(waveform), {}
+
+        speakers = {speaker for _, _, speaker in turns}
+        segments = []
+        with metrics.timed(timings, 'asr'):
+            if self.asr_pool is not None:
+                segments = self.transcribe_turns_parallel(
+                    waveform, turns, language=language, checkpoint=checkpoint, progress=progress
+                )
+            else:
+                for index, (start, end, speaker) in enumerate(turns, start=1):
+                    checkpoint()
+                    segments.append(
+                        self.transcribe_turn(waveform, start, end, speaker, language=language)
+                    )
+                    if progress:
+                        progress(index / len(turns))
+        checkpoint()
+
+        for stage, seconds in timings.items():
+            metrics.TRANSCRIPTION_STAGE_SECONDS.observe(seconds, stage=stage)
+
+        return {
+            'duration': duration,
+            'num_speakers': len(speakers),
+            'segments': segments,
+            'speaker_embeddings': {
+                self.segment_speaker(speaker): vector for speaker, vector in embeddings.items()
+            },
+            'timings': timings,
+        }
+
+    @staticmethod
+    def build_segments(transcription, segments):
+        """Build unsaved TranscriptionSegment objects from transcribe_file output."""
+        return [
+            TranscriptionSegment(transcription=transcription, **segment)
+            for segment in segments
+        ]
+
+    def transcribe_audio(self, audio_path, transcription_id, language=None, profile=False):
+        """Transcribe audio file with speaker diarization.
+
+        With profile=True, or settings.PROFILE_INFERENCE enabled, the job runs
+        under cProfile and the torch profiler and the artifacts are attached
+        to the transcription.
+        """
+        with profiling.profiled(Transcription, transcription_id, profile or settings.PROFILE_INFERENCE):
+            return self._transcribe_audio(audio_path, transcription_id, language)
+
+    def _transcribe_audio(self, audio_path, transcription_id, language=None):
         transcription = None
+        normalized_path = None
+        normalized_existed = True
+        started = time.perf_counter()
+        metrics.TRANSCRIPTION_IN_FLIGHT.inc()
         try:
-            logger.info(f"Starting transcription for {audio_path}")
             transcription = Transcription.objects.get(id=transcription_id)
-            transcription.status = 'processing'
-            transcription.save()
+            if transcription.status == 'cancelled' or transcription.cancel_requested:
+                raise JobCancelled("Transcription was cancelled")
+            normalized_name, normalized_path = storage.normalized_audio_path(transcription)
+            normalized_existed = os.path.exists(normalized_path)
+            duration = self.probe_duration(audio_path, normalized_path)
+            self.ensure_models_loaded()
 
-            # Get audio duration and load audio
-            waveform, sample_rate = torchaudio.load(audio_path)
-            duration = waveform.shape[1] / sample_rate
-            transcription.duration = duration
+            # Wait until the projected memory of this job fits the budget
+            with memory_budget.reserve(
+                f"Transcription {transcription_id}", self.estimate_memory(duration)
+            ) as reservation:
+                # Claim the job directly rather than through the writer, so a
+                # cancel that lands first wins and a queued write cannot undo it
+                started_processing = Transcription.objects.filter(
+                    pk=transcription_id, status='pending', cancel_requested=False
+                ).update(status='processing', progress=0.0, updated_at=timezone.now())
+                if not started_processing:
+                    # Cancelled meanwhile (or picked up elsewhere): leave the row as it is
+                    transcription = None
+                    raise JobCancelled(f"Transcription {transcription_id} is no longer pending")
+                transcription.status = 'processing'
 
-            # Perform diarization
-            diarization = self.perform_diarization(audio_path)
-            
-            # Get number of speakers
-            speakers = set()
-            for _, _, speaker in diarization.itertracks(yield_label=True):
-                speakers.add(speaker)
-            transcription.num_speakers = len(speakers)
-            transcription.save()
-
-            # Process each segment
-            for turn, _, speaker in diarization.itertracks(yield_label=True):
-                # Extract audio segment
-                start_sample = int(turn.start * sample_rate)
-                end_sample = int(turn.end * sample_rate)
-                segment_audio = waveform[:, start_sample:end_sample]
-                
-                # Save segment to temporary file
-                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                    temp_path = temp_file.name
-                    torchaudio.save(temp_path, segment_audio, sample_rate)
-                
+                result = self.transcribe_file(
+                    audio_path,
+                    language=language,
+                    checkpoint=JobControl(transcription_id, duration, checks=[reservation.check]),
+                    progress=lambda fraction: db_writer.update(Transcription, transcription_id, progress=fraction),
+                    normalized_path=normalized_path
+                )
+                transcription.normalized_audio.name = normalized_name
+                timings = result['timings']
+
+                transcription.duration = result['duration']
+                transcription.num_speakers = result['num_speakers']
+                transcription.status = 'completed'
+                transcription.progress = 1.0
+
+                # Segments are written first so their write time is part of the
+                # timings; the job reads 'processing' until the final update
+                with metrics.timed(timings, 'persistence'):
+                    db_writer.create(self.build_segments(transcription, result['segments']))
+                    db_writer.create(speakers.build_embeddings(transcription, result['speaker_embeddings']))
+                    db_writer.flush()
+                metrics.TRANSCRIPTION_STAGE_SECONDS.observe(timings['persistence'], stage='persistence')
+
+                # The final status and the timings become visible together
+                transcription.set_timings({**timings, 'processing': time.perf_counter() - started})
+                db_writer.update(
+                    Transcription, transcription_id,
+                    duration=transcription.duration,
+                    num_speakers=transcription.num_speakers,
+                    status='completed',
+                    progress=1.0,
+                    normalized_audio=normalized_name,
+                    version=F('version') + 1,  # bulk_create sends no signals
+                    processing_seconds=transcription.processing_seconds,
+                    real_time_factor=transcription.real_time_factor,
+                    updated_at=timezone.now(),
+                    **{field: getattr(transcription, field) for field in Transcription.TIMING_FIELDS}
+                )
+                db_writer.flush()
+
+            if result['speaker_embeddings']:
                 try:
-                    # Transcribe segment using Whisper
-                    result = self.whisper_model.transcribe(
-                        temp_path,
-                        language=language,  # Use provided language or auto-detect
-                        task="transcribe"
-                    )
-                    text = result["text"].strip()
-                    confidence = result.get("confidence", 0.0)
-                    detected_language = result.get("language", language or "en")
-                    
-                    # Create transcription segment
-                    TranscriptionSegment.objects.create(
-                        transcription=transcription,
-                        start_time=turn.start,
-                        end_time=turn.end,
-                        text=text,
-                        confidence=confidence,
-                        speaker=f"SPEAKER_{speaker.split('_')[-1]}",
-                        language=detected_language
-                    )
-                    
-                finally:
-                    # Clean up temporary file
-                    if os.path.exists(temp_path):
-                        os.remove(temp_path)
-
-            transcription.status = 'completed'
-            transcription.save()
-            logger.info(f"Transcription completed successfully for {audio_path}")
+                    speakers.identify(transcription, result['speaker_embeddings'])
+                except Exception as e:
+                    # Labels are a convenience; the transcript itself is complete
+                    logger.error(f"Error identifying speakers in transcription {transcription_id}: {str(e)}")
+
+            try:
+                storage.apply_retention(transcription)
+            except Exception as e:
+                # The transcript is done; keep the original audio rather than fail the job
+                logger.error(f"Error applying audio retention to transcription {transcription_id}: {str(e)}")
+
+            metrics.TRANSCRIPTION_JOBS.inc(status='completed')
+            metrics.TRANSCRIPTION_AUDIO_SECONDS.observe(transcription.duration)
+            if transcription.real_time_factor is not None:
+                metrics.TRANSCRIPTION_REAL_TIME_FACTOR.observe(transcription.real_time_factor)
+            logger.info(
+                f"Transcription completed successfully for {audio_path} in "
+                f"{transcription.processing_seconds:.2f}s (RTF {transcription.real_time_factor or 0:.3f})"
+            )
             return transcription
 
+        except JobStopped as e:
+            # Raised unchanged: a cancelled or timed out job is not a failure
+            logger.warning(f"Transcription {transcription_id} stopped ({e.status}): {str(e)}")
+            metrics.TRANSCRIPTION_JOBS.inc(status=e.status)
+            if transcription:
+                self._mark_failed(transcription, str(e), status=e.status)
+                if normalized_path and not normalized_existed:
+                    # Free the temp data of this run right away
+                    try:
+                        os.remove(normalized_path)
+                    except OSError:
+                        pass
+            raise
+
+        except MemoryBudgetExceeded as e:
+            # Raised unchanged so background workers can re-queue the job
+            logger.error(f"Transcription {transcription_id} stopped by memory budget: {str(e)}")
+            metrics.TRANSCRIPTION_JOBS.inc(status='failed')
+            if transcription:
+                self._mark_failed(transcription, f"Error in transcription: {str(e)}")
+            raise
+
         except Exception as e:
             error_msg = f"Error in transcription: {str(e)}"
             logger.error(error_msg)
+            metrics.TRANSCRIPTION_JOBS.inc(status='failed')
             if transcription:
-                transcription.status = 'failed'
-                transcription.error_message = error_msg
-                transcription.save()
+                self._mark_failed(transcription, error_msg)
             raise Exception(error_msg)
+        finally:
+            metrics.TRANSCRIPTION_IN_FLIGHT.dec()
 
-    def get_transcription_text(self, transcription_id, format='text'):
-        """Get formatted transcription text with speaker information.
-        
-        Args:
-            transcription_id: ID of the transcription
-            format: Output format ('text' or 'json')
-        """
+    @staticmethod
+    def _mark_failed(transcription, error_msg, status='failed'):
+        transcription.status = status
+        transcription.error_message = error_msg
+        db_writer.update(
+            Transcription, transcription.id,
+            status=status, error_message=error_msg, cancel_requested=False, updated_at=timezone.now()
+        )
         try:
-            transcription = Transcription.objects.get(id=transcription_id)
-            segments = TranscriptionSegment.objects.filter(
-                transcription=transcription
-            ).order_by('start_time')
-
-            if format == 'json':
-                # Return structured JSON format
-                return {
-                    'id': transcription.id,
-                    'status': transcription.status,
-                    'duration': transcription.duration,
-                    'num_speakers': transcription.num_speakers,
-                    'language': transcription.language,
-                    'segments': [
-                        {
-                            'speaker': segment.speaker,
-                            'start_time': segment.start_time,
-                            'end_time': segment.end_time,
-                            'text': segment.text,
-                            'confidence': segment.confidence,
-                            'language': segment.language
-                        }
-                        for segment in segments
-                    ]
-                }
-            else:
-                # Return formatted text
-                formatted_text = []
-                for segment in segments:
-                    timestamp = f"[{segment.start_time:.2f}-{segment.end_time:.2f}]"
-                    speaker = segment.speaker
-                    text = segment.text
-                    formatted_text.append(f"{timestamp} {speaker}: {text}")
-
-                return "\n".join(formatted_text)
-
+            db_writer.flush()
         except Exception as e:
-            error_msg = f"Error getting transcription text: {str(e)}"
-            logger.error(error_msg)
-            raise Exception(error_msg) 
\ No newline at end of file
+            logger.error(f"Could not mark transcription {transcription.id} as {status}: {str(e)}")
+
+    def get_transcription_text(self, transcription_id, format='text'):
+        """Get formatted transcription text. Kept for callers that already hold a service;
+        new code should use TranscriptQueryService, which needs no models."""
+        return TranscriptQueryService().get_transcription_text(transcription_id, format=format) 
\ No newline at end of file
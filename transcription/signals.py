@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Transcription, TranscriptionSegment
+
+
+@receiver(post_save, sender=TranscriptionSegment)
+def invalidate_transcript_renderings(sender, instance, **kwargs):
+    """Bump the transcript version after a single segment is edited.
+
+    Bulk writes (bulk_create, QuerySet.update and QuerySet.delete) do not go
+    through here and call Transcription.bump_version once themselves. There
+    is deliberately no post_delete receiver: it would turn every segment
+    delete, including cascades, into a row-by-row delete with an UPDATE each.
+    """
+    Transcription.bump_version(instance.transcription_id)
@@ -0,0 +1,219 @@
+import logging
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import Count, Max
+
+from .models import EnrolledSpeaker, SpeakerEmbedding
+
+logger = logging.getLogger(__name__)
+
+VECTOR_DTYPE = np.float32
+
+
+def to_blob(vector):
+    return np.asarray(vector, dtype=VECTOR_DTYPE).tobytes()
+
+
+def from_blob(blob):
+    return np.frombuffer(bytes(blob), dtype=VECTOR_DTYPE)
+
+
+def normalize(vector):
+    """Scale to unit length so a dot product is the cosine similarity."""
+    vector = np.asarray(vector, dtype=VECTOR_DTYPE)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SpeakerIndex:
+    """Nearest-neighbour search over enrolled speakers.
+
+    The enrolled embeddings are kept as rows of one unit-length NumPy matrix,
+    so matching every speaker of a recording is a single matrix product.
+    Enrolments in this process update the matrix in place; changes made by
+    other processes are picked up by comparing the enrolled count and last
+    update time before each search.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._matrix = np.zeros((0, 0), dtype=VECTOR_DTYPE)
+        self._ids = []
+        self._names = []
+        self._state = None
+
+    def _db_state(self):
+        state = EnrolledSpeaker.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+        return state['count'], state['latest']
+
+    def _reload(self, state):
+        rows = list(EnrolledSpeaker.objects.order_by('id').values_list('id', 'name', 'vector'))
+        vectors = [from_blob(vector) for _, _, vector in rows]
+        dims = {len(vector) for vector in vectors}
+        if len(dims) > 1:
+            # Embeddings from different models cannot be compared; keep the most common size
+            dim = max(dims, key=lambda d: sum(len(v) == d for v in vectors))
+            logger.warning(f"Enrolled speakers have embedding sizes {sorted(dims)}, using {dim}")
+            keep = [i for i, vector in enumerate(vectors) if len(vector) == dim]
+            rows = [rows[i] for i in keep]
+            vectors = [vectors[i] for i in keep]
+        self._ids = [row[0] for row in rows]
+        self._names = [row[1] for row in rows]
+        self._matrix = np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=VECTOR_DTYPE)
+        self._state = state
+        logger.info(f"Loaded {len(self._ids)} enrolled speakers into the speaker index")
+
+    def _ensure_current(self):
+        state = self._db_state()
+        if state != self._state:
+            self._reload(state)
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_current()
+            return len(self._ids)
+
+    def add(self, speaker):
+        """Insert or replace the row of an EnrolledSpeaker without reloading the index."""
+        vector = from_blob(speaker.vector)
+        with self._lock:
+            if self._state is None:
+                # First use: the full load already includes this speaker
+                self._reload(self._db_state())
+                return
+            if speaker.pk in self._ids:
+                row = self._ids.index(speaker.pk)
+                self._matrix[row] = vector
+                self._names[row] = speaker.name
+            elif not self._ids or self._matrix.shape[1] == len(vector):
+                self._matrix = np.vstack([self._matrix, vector[None, :]]) if self._ids else vector[None, :].copy()
+                self._ids.append(speaker.pk)
+                self._names.append(speaker.name)
+            self._state = self._db_state()
+
+    def remove(self, speaker_id):
+        with self._lock:
+            if speaker_id in self._ids:
+                row = self._ids.index(speaker_id)
+                self._matrix = np.delete(self._matrix, row, axis=0)
+                del self._ids[row]
+                del self._names[row]
+            self._state = self._db_state()
+
+    def match(self, embeddings, threshold=None):
+        """Assign enrolled speakers to the speakers of one recording.
+
+        Args:
+            embeddings: Dict of per-file speaker -> embedding vector
+            threshold: Minimum cosine similarity, settings.SPEAKER_MATCH_THRESHOLD by default
+
+        Returns:
+            dict: speaker -> (enrolled speaker id, name, similarity) for the
+            speakers that matched. Each enrolled speaker is used at most once,
+            best similarities first.
+        """
+        threshold = settings.SPEAKER_MATCH_THRESHOLD if threshold is None else threshold
+        with self._lock:
+            self._ensure_current()
+            if not self._ids or not embeddings:
+                return {}
+            speakers = [s for s, v in embeddings.items() if len(v) == self._matrix.shape[1]]
+            if not speakers:
+                return {}
+            queries = np.vstack([normalize(embeddings[s]) for s in speakers])
+            scores = queries @ self._matrix.T
+            ids, names = list(self._ids), list(self._names)
+
+        matches = {}
+        used = set()
+        for flat in np.argsort(scores, axis=None)[::-1]:
+            row, column = divmod(int(flat), scores.shape[1])
+            score = float(scores[row, column])
+            if score < threshold:
+                break
+            if speakers[row] in matches or column in used:
+                continue
+            matches[speakers[row]] = (ids[column], names[column], score)
+            used.add(column)
+        return matches
+
+
+speaker_index = SpeakerIndex()
+
+
+def build_embeddings(transcription, embeddings):
+    """Build unsaved SpeakerEmbedding objects from transcribe_file's speaker_embeddings."""
+    return [
+        SpeakerEmbedding(transcription=transcription, speaker=speaker, vector=to_blob(vector))
+        for speaker, vector in embeddings.items()
+    ]
+
+
+def identify(transcription, embeddings=None):
+    """Label the speakers of a transcription that match an enrolled speaker.
+
+    Args:
+        transcription: Transcription whose segments get the matched names as speaker_label
+        embeddings: Optional speaker -> vector dict; read from the stored
+            SpeakerEmbedding rows when omitted
+
+    Returns:
+        dict: speaker -> {'name': ..., 'similarity': ...} for matched speakers
+    """
+    if embeddings is None:
+        embeddings = {
+            speaker: from_blob(vector)
+            for speaker, vector in transcription.speaker_embeddings.values_list('speaker', 'vector')
+        }
+    matches = speaker_index.match(embeddings)
+    for speaker, (enrolled_id, name, similarity) in matches.items():
+        transcription.label_speaker(speaker, name)
+        SpeakerEmbedding.objects.filter(transcription=transcription, speaker=speaker).update(
+            enrolled_speaker_id=enrolled_id, similarity=similarity
+        )
+    if matches:
+        logger.info(f"Identified {len(matches)} speakers in transcription {transcription.id}")
+    return {
+        speaker: {'name': name, 'similarity': round(similarity, 4)}
+        for speaker, (_, name, similarity) in matches.items()
+    }
+
+
+def enroll(transcription, speaker, name):
+    """Enroll the voice of `speaker` in `transcription` under `name`.
+
+    A new name creates an EnrolledSpeaker; an existing one folds this voice
+    into its mean embedding. The speaker's segments are labeled with the name.
+
+    Raises:
+        SpeakerEmbedding.DoesNotExist: no embedding was stored for the speaker
+        ValueError: the embedding size differs from the enrolled speaker's
+    """
+    embedding = SpeakerEmbedding.objects.get(transcription=transcription, speaker=speaker)
+    vector = normalize(from_blob(embedding.vector))
+
+    with db_transaction.atomic():
+        enrolled, created = EnrolledSpeaker.objects.select_for_update().get_or_create(
+            name=name, defaults={'vector': to_blob(vector), 'num_samples': 1}
+        )
+        if not created and embedding.enrolled_speaker_id != enrolled.pk:
+            current = from_blob(enrolled.vector)
+            if len(current) != len(vector):
+                raise ValueError(
+                    f"Embedding size {len(vector)} does not match the {len(current)} enrolled for {name}"
+                )
+            # Running mean of unit vectors, renormalized
+            mean = (current * enrolled.num_samples + vector) / (enrolled.num_samples + 1)
+            enrolled.vector = to_blob(normalize(mean))
+            enrolled.num_samples += 1
+            enrolled.save(update_fields=['vector', 'num_samples', 'updated_at'])
+        embedding.enrolled_speaker = enrolled
+        embedding.similarity = 1.0
+        embedding.save(update_fields=['enrolled_speaker', 'similarity'])
+
+    speaker_index.add(enrolled)
+    transcription.label_speaker(speaker, name)
+    return enrolled
@@ -0,0 +1,156 @@
+import os
+import logging
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from . import audio
+
+logger = logging.getLogger(__name__)
+
+# Archive format -> (soundfile container, subtype, file extension)
+ARCHIVE_FORMATS = {
+    'flac': ('FLAC', 'PCM_16', 'flac'),
+    'opus': ('OGG', 'OPUS', 'opus'),
+}
+
+
+def _file_size(field):
+    try:
+        return field.size if field else 0
+    except (OSError, ValueError):
+        return 0
+
+
+def normalized_audio_path(transcription):
+    """Storage name and local path of a transcription's normalized audio file.
+
+    The file may not exist yet; its directory is created so it can be written.
+    """
+    if transcription.normalized_audio:
+        name = transcription.normalized_audio.name
+    else:
+        field = transcription._meta.get_field('normalized_audio')
+        name = field.generate_filename(
+            transcription, f"transcription_{transcription.id}.{audio.normalized_extension()}"
+        )
+    path = default_storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return name, path
+
+
+def drop_normalized(transcription):
+    """Delete the normalized audio cache. It is rebuilt from the audio when needed.
+
+    Returns:
+        int: Bytes of storage freed
+    """
+    if not transcription.normalized_audio:
+        return 0
+    freed = _file_size(transcription.normalized_audio)
+    transcription.normalized_audio.delete(save=False)
+    transcription.save(update_fields=['normalized_audio', 'updated_at'])
+    return freed
+
+
+def archive_audio(transcription, format=None, keep_normalized=False):
+    """Replace the original upload with a 16kHz mono FLAC or Opus copy.
+
+    Args:
+        transcription: Transcription whose audio is still the original upload
+        format: 'flac' or 'opus', defaults to settings.AUDIO_ARCHIVE_FORMAT
+        keep_normalized: Keep the normalized audio used for fast reprocessing
+
+    The original is kept when the archive copy would not be smaller, which
+    is common for already compressed uploads such as mp3 or m4a. The attempt
+    is recorded in archive_attempted_at so the audio is not decoded again.
+
+    Returns:
+        int: Bytes of storage saved
+    """
+    import numpy as np
+    import soundfile
+
+    format = format or settings.AUDIO_ARCHIVE_FORMAT
+    if format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unknown audio archive format '{format}'. Supported: {', '.join(ARCHIVE_FORMATS)}")
+    if (transcription.audio_storage != 'original' or not transcription.audio_file
+            or transcription.archive_attempted_at):
+        return 0 if keep_normalized else drop_normalized(transcription)
+
+    container, subtype, extension = ARCHIVE_FORMATS[format]
+    original_size = _file_size(transcription.audio_file)
+    if transcription.normalized_audio:
+        # Already decoded at processing time, no need to decode again
+        samples = audio.read_normalized(transcription.normalized_audio.path)
+    else:
+        samples = np.asarray(audio.load_normalized(transcription.audio_file.path)[0])
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = os.path.join(temp_dir, f"archive.{extension}")
+        soundfile.write(temp_path, samples, audio.SAMPLE_RATE, format=container, subtype=subtype)
+        archive_size = os.path.getsize(temp_path)
+        if original_size and archive_size >= original_size:
+            logger.info(
+                f"Keeping original audio of transcription {transcription.id}: the {format} copy "
+                f"is not smaller ({original_size / 1024:.0f}KB -> {archive_size / 1024:.0f}KB)"
+            )
+            transcription.archive_attempted_at = timezone.now()
+            transcription.save(update_fields=['archive_attempted_at', 'updated_at'])
+            return 0 if keep_normalized else drop_normalized(transcription)
+        base_name = os.path.splitext(os.path.basename(transcription.audio_file.name))[0]
+        with open(temp_path, 'rb') as f:
+            transcription.archived_audio.save(f"{base_name}.{extension}", File(f), save=False)
+
+    transcription.audio_file.delete(save=False)
+    transcription.audio_storage = 'archived'
+    transcription.save(update_fields=['audio_file', 'archived_audio', 'audio_storage', 'updated_at'])
+
+    saved = original_size - _file_size(transcription.archived_audio)
+    logger.info(
+        f"Archived audio of transcription {transcription.id} as {format} "
+        f"({original_size / 1024:.0f}KB -> {_file_size(transcription.archived_audio) / 1024:.0f}KB)"
+    )
+    if not keep_normalized:
+        saved += drop_normalized(transcription)
+    return saved
+
+
+def delete_audio(transcription):
+    """Delete all stored audio of a transcription, keeping its transcript.
+
+    Returns:
+        int: Bytes of storage freed
+    """
+    freed = 0
+    for field in (transcription.audio_file, transcription.archived_audio, transcription.normalized_audio):
+        if field:
+            freed += _file_size(field)
+            field.delete(save=False)
+    transcription.audio_storage = 'deleted'
+    transcription.save(update_fields=['audio_file', 'archived_audio', 'normalized_audio', 'audio_storage', 'updated_at'])
+    logger.info(f"Deleted audio of transcription {transcription.id} ({freed / 1024:.0f}KB)")
+    return freed
+
+
+def apply_retention(transcription, policy=None):
+    """Apply the audio retention policy after a transcription has completed.
+
+    Policies: 'keep' leaves the original, 'archive' transcodes it to a
+    compact copy, 'delete' removes the audio altogether. The normalized
+    audio is kept so reprocessing skips decoding; compact_audio drops it.
+
+    Returns:
+        int: Bytes of storage saved
+    """
+    policy = policy or settings.AUDIO_RETENTION_POLICY
+    if policy == 'keep':
+        return 0
+    if policy == 'archive':
+        return archive_audio(transcription, keep_normalized=True)
+    if policy == 'delete':
+        return delete_audio(transcription)
+    raise ValueError(f"Unknown audio retention policy '{policy}'. Supported: keep, archive, delete")
@@ -1,3 +1,662 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from audio_blog_project.memory import MemoryBudgetExceeded
+from .control import JobCancelled, JobControl, JobTimedOut, time_limit
+from . import storage, wordpack
+from .exporters import buffered
+from .models import Transcription, TranscriptionBatch, TranscriptionSegment
+from .search import fts_query
+from .writer import BatchedWriter, db_writer
+
+
+def make_transcription(status='completed', segments=(), **fields):
+    """Create a transcription with (start, end, speaker, text) segments."""
+    fields.setdefault('audio_file', 'audio_files/test.wav')
+    transcription = Transcription.objects.create(status=status, **fields)
+    TranscriptionSegment.objects.bulk_create([
+        TranscriptionSegment(
+            transcription=transcription, speaker=speaker, text=text,
+            start_time=start, end_time=end, confidence=0.9
+        )
+        for start, end, speaker, text in segments
+    ])
+    return transcription
+
+
+class SegmentPaginationTests(TestCase):
+    def setUp(self):
+        self.transcription = make_transcription(segments=[
+            (float(i), i + 1.0, f'SPEAKER_0{i % 2}', f'Segment {i}') for i in range(7)
+        ])
+        self.url = reverse('transcription-segments', args=[self.transcription.pk])
+
+    def test_pages_follow_cursor_in_time_order(self):
+        texts = []
+        response = self.client.get(self.url, {'page_size': 3})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            self.assertLessEqual(len(body['results']), 3)
+            texts += [segment['text'] for segment in body['results']]
+            if not body['next']:
+                break
+            response = self.client.get(body['next'])
+        self.assertEqual(texts, [f'Segment {i}' for i in range(7)])
+
+    def test_time_window_returns_overlapping_segments(self):
+        body = self.client.get(self.url, {'start': 2.5, 'end': 4.0}).json()
+        self.assertEqual([segment['text'] for segment in body['results']], ['Segment 2', 'Segment 3'])
+
+    def test_speaker_filter(self):
+        body = self.client.get(self.url, {'speaker': 'SPEAKER_01'}).json()
+        self.assertEqual([segment['text'] for segment in body['results']], ['Segment 1', 'Segment 3', 'Segment 5'])
+
+    def test_invalid_window(self):
+        self.assertEqual(self.client.get(self.url, {'start': 'soon'}).status_code, 400)
+
+
+class TranscriptETagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.transcription = make_transcription(segments=[
+            (0.0, 2.0, 'SPEAKER_00', 'First'),
+            (2.0, 4.0, 'SPEAKER_01', 'Second'),
+        ])
+        self.url = reverse('transcription-text', args=[self.transcription.pk])
+
+    def test_matching_etag_gets_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Compressed responses hand out the weak form
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=f'W/{etag}').status_code, 304)
+
+    def test_formats_have_their_own_etag(self):
+        text_etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, {'format': 'json'}, HTTP_IF_NONE_MATCH=text_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], text_etag)
+
+    def test_segment_edit_invalidates_etag_and_cache(self):
+        etag = self.client.get(self.url)['ETag']
+        segment = self.transcription.segments.get(text='First')
+        segment.text = 'Edited'
+        segment.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Edited', response.json()['text'])
+
+    def test_unfinished_transcripts_have_no_etag(self):
+        Transcription.objects.filter(pk=self.transcription.pk).update(status='processing')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_reprocess_bumps_version_once(self):
+        segment_ids = list(self.transcription.segments.values_list('id', flat=True))
+        url = reverse('transcription-reprocess', args=[self.transcription.pk])
+        with mock.patch('transcription.views.transcription_worker.submit') as submit, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, 202)
+        submit.assert_called_once_with([self.transcription.pk])
+
+        self.transcription.refresh_from_db()
+        self.assertEqual(self.transcription.version, 2)
+        self.assertFalse(TranscriptionSegment.objects.filter(id__in=segment_ids).exists())
+        # Segments go in one DELETE, without loading the rows
+        segment_table = TranscriptionSegment._meta.db_table
+        self.assertFalse([q for q in queries if q['sql'].startswith('SELECT') and f'FROM "{segment_table}"' in q['sql']])
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.transcription = make_transcription(
+            audio_file='audio_files/interview.wav',
+            segments=[
+                (3661.5, 3663.25, 'SPEAKER_01', 'Fine, thanks.'),
+                (0.0, 1.5, 'SPEAKER_00', 'How are you?'),
+            ]
+        )
+        self.transcription.segments.filter(speaker='SPEAKER_00').update(speaker_label='Host')
+
+    def export(self, export_format, transcription=None):
+        transcription = transcription or self.transcription
+        return self.client.get(reverse('transcription-export', args=[transcription.pk, export_format]))
+
+    def content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_srt(self):
+        response = self.export('srt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-subrip; charset=utf-8')
+        self.assertEqual(
+            response['Content-Disposition'], f'attachment; filename="transcription_{self.transcription.pk}.srt"'
+        )
+        self.assertEqual(self.content(response), (
+            "1\n00:00:00,000 --> 00:00:01,500\nHost: How are you?\n\n"
+            "2\n01:01:01,500 --> 01:01:03,250\nSPEAKER_01: Fine, thanks.\n\n"
+        ))
+
+    def test_vtt(self):
+        self.assertEqual(self.content(self.export('vtt')), (
+            "WEBVTT\n\n"
+            "00:00:00.000 --> 00:00:01.500\n<v Host>How are you?\n\n"
+            "01:01:01.500 --> 01:01:03.250\n<v SPEAKER_01>Fine, thanks.\n\n"
+        ))
+
+    def test_rttm_uses_speaker_ids(self):
+        self.assertEqual(self.content(self.export('rttm')), (
+            "SPEAKER interview 1 0.000 1.500 <NA> <NA> SPEAKER_00 <NA> <NA>\n"
+            "SPEAKER interview 1 3661.500 1.750 <NA> <NA> SPEAKER_01 <NA> <NA>\n"
+        ))
+
+    def test_txt(self):
+        self.assertEqual(self.content(self.export('txt')), (
+            "[0.00-1.50] Host: How are you?\n"
+            "[3661.50-3663.25] SPEAKER_01: Fine, thanks.\n"
+        ))
+
+    def test_etag_differs_per_format(self):
+        self.assertNotEqual(self.export('srt')['ETag'], self.export('vtt')['ETag'])
+
+    def test_unfinished_transcription_conflicts(self):
+        response = self.export('srt', make_transcription(status='processing'))
+        self.assertEqual(response.status_code, 409)
+
+    def test_unknown_format(self):
+        response = self.client.get(f"{reverse('transcription-detail', args=[self.transcription.pk])}export/docx/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_buffered_joins_lines_into_chunks(self):
+        chunks = list(buffered((f"{i:04d}\n" for i in range(10)), size=20))
+        self.assertEqual([len(chunk) for chunk in chunks], [20, 20, 10])
+        self.assertEqual(''.join(chunks), ''.join(f"{i:04d}\n" for i in range(10)))
+
+
+class FtsQueryTests(TestCase):
+    def test_terms_are_quoted(self):
+        self.assertEqual(fts_query('budget review'), '"budget" "review"')
+
+    def test_prefix_is_kept(self):
+        self.assertEqual(fts_query('transcri*'), '"transcri"*')
+
+    def test_syntax_cannot_be_injected(self):
+        self.assertEqual(fts_query('say "hi" OR NEAR(a'), '"say" """hi""" "OR" "NEAR(a"')
+
+    def test_terms_without_word_characters_are_dropped(self):
+        self.assertEqual(fts_query('- * " ()'), '')
+
+
+class SegmentSearchTests(TestCase):
+    def setUp(self):
+        self.first = make_transcription(segments=[
+            (0.0, 2.0, 'SPEAKER_00', 'The quarterly budget is ready'),
+            (2.0, 4.0, 'SPEAKER_01', 'Let us review the budget budget numbers'),
+        ])
+        self.second = make_transcription(segments=[(0.0, 3.0, 'SPEAKER_00', 'Budgeting for next year')])
+        self.url = reverse('transcription-search')
+
+    def texts(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [result['text'] for result in response.json()['results']]
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(
+            self.texts(self.client.get(self.url, {'q': 'budget review'})),
+            ['Let us review the budget budget numbers']
+        )
+
+    def test_prefix_match(self):
+        self.assertCountEqual(
+            self.texts(self.client.get(self.url, {'q': 'budget*', 'transcription': self.second.pk})),
+            ['Budgeting for next year']
+        )
+
+    def test_limited_to_one_transcription(self):
+        texts = self.texts(self.client.get(self.url, {'q': 'budget', 'transcription': self.first.pk}))
+        self.assertEqual(len(texts), 2)
+
+    def test_query_is_required(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q': 'budget', 'transcription': 'x'}).status_code, 400)
+
+
+# Batches stay open until a flush arrives, so each test's writes form one batch
+@override_settings(WRITER_FLUSH_INTERVAL=5.0)
+class BatchedWriterTests(TransactionTestCase):
+    def setUp(self):
+        self.writer = BatchedWriter()
+        self.transcription = make_transcription(status='pending')
+
+    def test_updates_of_one_row_are_merged(self):
+        self.writer.update(Transcription, self.transcription.pk, status='processing', progress=0.0)
+        self.writer.update(Transcription, self.transcription.pk, progress=0.5)
+        with CaptureQueriesContext(connection) as queries:
+            self.writer._apply([
+                ('update', (Transcription, self.transcription.pk, {'status': 'processing', 'progress': 0.0})),
+                ('update', (Transcription, self.transcription.pk, {'progress': 0.5})),
+            ])
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE')]), 1)
+
+        self.writer.flush()
+        self.transcription.refresh_from_db()
+        self.assertEqual(self.transcription.status, 'processing')
+        self.assertEqual(self.transcription.progress, 0.5)
+
+    def test_creates_are_written_before_updates(self):
+        self.writer.update(Transcription, self.transcription.pk, status='completed')
+        self.writer.create([
+            TranscriptionSegment(
+                transcription=self.transcription, speaker='SPEAKER_00', text=f'Segment {i}',
+                start_time=float(i), end_time=i + 1.0
+            )
+            for i in range(3)
+        ])
+        self.writer.flush()
+        self.assertEqual(self.transcription.segments.count(), 3)
+        self.assertEqual(Transcription.objects.get(pk=self.transcription.pk).status, 'completed')
+
+    def test_flush_raises_failed_write_and_keeps_the_rest(self):
+        other = make_transcription(status='pending')
+        self.writer.update(Transcription, self.transcription.pk, status=None)
+        self.writer.update(Transcription, other.pk, progress=0.25)
+        with self.assertRaises(IntegrityError):
+            self.writer.flush()
+        self.assertEqual(Transcription.objects.get(pk=other.pk).progress, 0.25)
+
+        # The writer keeps running after a failed batch
+        self.writer.update(Transcription, self.transcription.pk, status='processing')
+        self.writer.flush()
+        self.assertEqual(Transcription.objects.get(pk=self.transcription.pk).status, 'processing')
+
+
+@override_settings(AUDIO_ARCHIVE_FORMAT='flac', NORMALIZED_AUDIO_DTYPE='float32')
+class RetentionTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = self.settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        os.makedirs(os.path.join(media_root, 'audio_files'))
+        self.media_root = media_root
+
+    def make_stored(self, name='speech.wav', format='WAV', subtype='PCM_16'):
+        """A completed transcription with 5s of audio and its normalized cache."""
+        import numpy as np
+        import soundfile
+
+        t = np.arange(5 * 16000) / 16000
+        samples = (0.3 * np.sin(2 * np.pi * 220 * t)).astype('float32')
+        soundfile.write(
+            os.path.join(self.media_root, 'audio_files', name), samples, 16000, format=format, subtype=subtype
+        )
+        transcription = make_transcription(audio_file=f'audio_files/{name}')
+        normalized_name, normalized_path = storage.normalized_audio_path(transcription)
+        samples.tofile(normalized_path)
+        transcription.normalized_audio.name = normalized_name
+        transcription.save(update_fields=['normalized_audio'])
+        return transcription
+
+    def test_keep_leaves_all_audio(self):
+        transcription = self.make_stored()
+        self.assertEqual(storage.apply_retention(transcription, 'keep'), 0)
+        transcription.refresh_from_db()
+        self.assertEqual(transcription.audio_storage, 'original')
+        self.assertTrue(os.path.exists(transcription.audio_file.path))
+        self.assertTrue(os.path.exists(transcription.normalized_audio.path))
+
+    def test_archive_replaces_original(self):
+        transcription = self.make_stored()
+        original_path = transcription.audio_file.path
+        self.assertGreater(storage.apply_retention(transcription, 'archive'), 0)
+        transcription.refresh_from_db()
+        self.assertEqual(transcription.audio_storage, 'archived')
+        self.assertFalse(transcription.audio_file)
+        # Kept for reprocessing until compact_audio runs
+        self.assertTrue(os.path.exists(transcription.normalized_audio.path))
+        self.assertFalse(os.path.exists(original_path))
+        self.assertTrue(transcription.archived_audio.name.endswith('.flac'))
+        self.assertEqual(transcription.audio_path, transcription.archived_audio.path)
+
+    def test_archive_keeps_original_when_not_smaller(self):
+        transcription = self.make_stored('speech.ogg', format='OGG', subtype='VORBIS')
+        original_path = transcription.audio_file.path
+        self.assertEqual(storage.archive_audio(transcription, keep_normalized=True), 0)
+        transcription.refresh_from_db()
+        self.assertEqual(transcription.audio_storage, 'original')
+        self.assertFalse(transcription.archived_audio)
+        self.assertTrue(os.path.exists(original_path))
+        self.assertIsNotNone(transcription.archive_attempted_at)
+
+        # The attempt is recorded, so the audio is not decoded again
+        with mock.patch.object(storage.audio, 'read_normalized') as read_normalized:
+            self.assertEqual(storage.archive_audio(transcription, keep_normalized=True), 0)
+        read_normalized.assert_not_called()
+
+    def test_compact_audio_skips_kept_originals(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        kept = self.make_stored('speech.ogg', format='OGG', subtype='VORBIS')
+        storage.archive_audio(kept)
+        archivable = self.make_stored()
+        normalized_path = archivable.normalized_audio.path
+
+        out = StringIO()
+        call_command('compact_audio', '--older-than', '0', stdout=out)
+        self.assertIn('Processed 1 transcriptions (0 failed)', out.getvalue())
+        archivable.refresh_from_db()
+        self.assertEqual(archivable.audio_storage, 'archived')
+        self.assertFalse(archivable.normalized_audio)
+        self.assertFalse(os.path.exists(normalized_path))
+        kept.refresh_from_db()
+        self.assertEqual(kept.audio_storage, 'original')
+
+        out = StringIO()
+        call_command('compact_audio', '--older-than', '0', stdout=out)
+        self.assertIn('Processed 0 transcriptions', out.getvalue())
+
+    def test_delete_removes_all_audio(self):
+        transcription = self.make_stored()
+        original_path = transcription.audio_file.path
+        storage.apply_retention(transcription, 'delete')
+        transcription.refresh_from_db()
+        self.assertEqual(transcription.audio_storage, 'deleted')
+        self.assertFalse(transcription.audio_file)
+        self.assertFalse(transcription.normalized_audio)
+        self.assertFalse(os.path.exists(original_path))
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            storage.apply_retention(make_transcription(), 'shred')
+
+
+class BatchStatusSummaryTests(TestCase):
+    def make_batch(self, *statuses):
+        batch = TranscriptionBatch.objects.create(total_files=len(statuses))
+        for status in statuses:
+            make_transcription(status=status, batch=batch)
+        return batch
+
+    def test_all_pending(self):
+        summary = self.make_batch('pending', 'pending').status_summary()
+        self.assertEqual(summary['status'], 'pending')
+        self.assertEqual(summary['total'], 2)
+
+    def test_running_jobs_keep_batch_processing(self):
+        summary = self.make_batch('completed', 'processing', 'timed_out').status_summary()
+        self.assertEqual(summary['status'], 'processing')
+
+    def test_all_timed_out_is_failed(self):
+        summary = self.make_batch('timed_out', 'timed_out').status_summary()
+        self.assertEqual(summary['status'], 'failed')
+        self.assertEqual(summary['timed_out'], 2)
+        self.assertEqual(summary['failures'], 2)
+
+    def test_failures_count_failed_and_timed_out(self):
+        summary = self.make_batch('completed', 'failed', 'timed_out').status_summary()
+        self.assertEqual(summary['status'], 'completed')
+        self.assertEqual(summary['failures'], 2)
+
+    def test_failed_and_cancelled_without_completed_is_failed(self):
+        summary = self.make_batch('failed', 'cancelled').status_summary()
+        self.assertEqual(summary['status'], 'failed')
+
+    def test_all_cancelled(self):
+        summary = self.make_batch('cancelled', 'cancelled').status_summary()
+        self.assertEqual(summary['status'], 'cancelled')
+        self.assertEqual(summary['failures'], 0)
+
+
+@override_settings(CANCEL_POLL_INTERVAL=0, TRANSCRIPTION_TIMEOUT_BASE=0, TRANSCRIPTION_TIMEOUT_FACTOR=0)
+class JobControlTests(TestCase):
+    def setUp(self):
+        self.transcription = make_transcription(status='processing')
+
+    def test_passes_while_running(self):
+        JobControl(self.transcription.pk, 60.0)()
+
+    def test_cancel_requested_stops_job(self):
+        control = JobControl(self.transcription.pk, 60.0)
+        Transcription.objects.filter(pk=self.transcription.pk).update(cancel_requested=True)
+        with self.assertRaises(JobCancelled):
+            control()
+
+    def test_cancelled_status_stops_job(self):
+        control = JobControl(self.transcription.pk, 60.0)
+        Transcription.objects.filter(pk=self.transcription.pk).update(status='cancelled')
+        with self.assertRaises(JobCancelled):
+            control()
+
+    def test_no_limit_when_disabled(self):
+        self.assertIsNone(time_limit(3600.0))
+
+    @override_settings(TRANSCRIPTION_TIMEOUT_BASE=10, TRANSCRIPTION_TIMEOUT_FACTOR=0.5)
+    def test_time_limit_scales_with_duration(self):
+        self.assertEqual(time_limit(60.0), 40.0)
+        control = JobControl(self.transcription.pk, 60.0)
+        control.started -= 41.0
+        with self.assertRaises(JobTimedOut):
+            control()
+
+    def test_runs_extra_checks(self):
+        def over_budget():
+            raise MemoryBudgetExceeded("over budget")
+
+        with self.assertRaises(MemoryBudgetExceeded):
+            JobControl(self.transcription.pk, 60.0, checks=[over_budget])()
+
+
+@skipUnless(
+    settings.USE_FAKE_INFERENCE,
+    "end-to-end jobs run on the fake inference backends: set USE_FAKE_INFERENCE=True in the environment "
+    "(torch is not needed)"
+)
+@override_settings(CANCEL_POLL_INTERVAL=0, AUDIO_RETENTION_POLICY='keep')
+class TranscriptionJobTests(TransactionTestCase):
+    """End-to-end jobs on the fake inference backends."""
+
+    def setUp(self):
+        from .management.commands.benchmark import generate_conversation
+        from .services import TranscriptionService
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = self.settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        os.makedirs(os.path.join(media_root, 'audio_files'))
+        generate_conversation(os.path.join(media_root, 'audio_files', 'conversation.wav'), 20, seed=1)
+        self.transcription = Transcription.objects.create(
+            audio_file='audio_files/conversation.wav', status='pending'
+        )
+        self.service = TranscriptionService()
+        self.cancel_url = reverse('transcription-cancel', args=[self.transcription.pk])
+
+    def run_job(self):
+        return self.service.transcribe_audio(self.transcription.audio_path, self.transcription.pk)
+
+    def test_completed_job(self):
+        self.run_job()
+        self.transcription.refresh_from_db()
+        self.assertEqual(self.transcription.status, 'completed')
+        self.assertEqual(self.transcription.progress, 1.0)
+        self.assertEqual(self.transcription.version, 2)
+        self.assertTrue(self.transcription.segments.exists())
+        # Timings are written together with the completed status
+        self.assertIsNotNone(self.transcription.processing_seconds)
+        self.assertIsNotNone(self.transcription.real_time_factor)
+        # The normalized audio is kept so reprocessing skips decoding
+        self.assertTrue(os.path.exists(self.transcription.normalized_audio.path))
+
+    def test_cancel_pending_job_before_it_is_claimed(self):
+        # The cancel lands after the worker read the row as pending but
+        # before it switched it to processing
+        probe_duration = self.service.probe_duration
+        responses = []
+
+        def cancel_then_probe(*args, **kwargs):
+            responses.append(self.client.post(self.cancel_url))
+            return probe_duration(*args, **kwargs)
+
+        with mock.patch.object(self.service, 'probe_duration', side_effect=cancel_then_probe):
+            with self.assertRaises(JobCancelled):
+                self.run_job()
+        db_writer.flush()
+
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(responses[0].json()['status'], 'cancelled')
+        self.transcription.refresh_from_db()
+        self.assertEqual(self.transcription.status, 'cancelled')
+        self.assertEqual(self.transcription.error_message, "Cancelled before processing started")
+        self.assertFalse(self.transcription.segments.exists())
+
+    def test_cancel_running_job(self):
+        diarize = self.service.diarize
+        responses = []
+
+        def cancel_then_diarize(*args, **kwargs):
+            responses.append(self.client.post(self.cancel_url))
+            return diarize(*args, **kwargs)
+
+        with mock.patch.object(self.service, 'diarize', side_effect=cancel_then_diarize):
+            with self.assertRaises(JobCancelled):
+                self.run_job()
+
+        self.assertEqual(responses[0].status_code, 202)
+        self.transcription.refresh_from_db()
+        self.assertEqual(self.transcription.status, 'cancelled')
+        self.assertFalse(self.transcription.segments.exists())
+
+    def test_cancel_finished_job_conflicts(self):
+        self.run_job()
+        response = self.client.post(self.cancel_url)
+        self.assertEqual(response.status_code, 409)
+
+    @override_settings(TRANSCRIPTION_TIMEOUT_BASE=0.05, TRANSCRIPTION_TIMEOUT_FACTOR=0)
+    def test_time_limit_stops_job(self):
+        diarize = self.service.diarize
+
+        def slow_diarize(*args, **kwargs):
+            time.sleep(0.1)
+            return diarize(*args, **kwargs)
+
+        with mock.patch.object(self.service, 'diarize', side_effect=slow_diarize):
+            with self.assertRaises(JobTimedOut):
+                self.run_job()
+        self.transcription.refresh_from_db()
+        self.assertEqual(self.transcription.status, 'timed_out')
+
+
+class WordpackTests(TestCase):
+    WORDS = [
+        {'word': 'Hello', 'start': 0.0, 'end': 0.42, 'probability': 0.98},
+        {'word': 'wörld', 'start': 0.5, 'end': 1.1, 'probability': 0.5},
+        {'word': '!', 'start': 1.1, 'end': 1.1},
+    ]
+
+    def test_round_trip(self):
+        blob = wordpack.pack(self.WORDS)
+        self.assertEqual(wordpack.count(blob), 3)
+        self.assertEqual(wordpack.unpack(blob, segment_start=10.0), [
+            {'word': 'Hello', 'start': 10.0, 'end': 10.42, 'probability': 0.98},
+            {'word': 'wörld', 'start': 10.5, 'end': 11.1, 'probability': 0.502},
+            {'word': '!', 'start': 11.1, 'end': 11.1, 'probability': 1.0},
+        ])
+
+    def test_unpack_accepts_memoryview(self):
+        blob = wordpack.pack(self.WORDS)
+        self.assertEqual(wordpack.unpack(memoryview(blob)), wordpack.unpack(blob))
+
+    def test_no_words(self):
+        self.assertIsNone(wordpack.pack([]))
+        self.assertIsNone(wordpack.pack(None))
+        self.assertEqual(wordpack.unpack(None), [])
+        self.assertEqual(wordpack.count(None), 0)
+
+    def test_out_of_range_values_are_clamped(self):
+        blob = wordpack.pack([{'word': 'x', 'start': -1.0, 'end': -2.0, 'probability': 1.5}])
+        self.assertEqual(wordpack.unpack(blob), [{'word': 'x', 'start': 0.0, 'end': 0.0, 'probability': 1.0}])
+
+    def test_rejects_other_data(self):
+        with self.assertRaises(ValueError):
+            wordpack.unpack(b'XX' + wordpack.pack(self.WORDS)[2:])
+
+    def test_segments_include_words(self):
+        transcription = make_transcription(segments=[(5.0, 6.5, 'SPEAKER_00', 'Hello world !')])
+        TranscriptionSegment.objects.filter(transcription=transcription).update(words=wordpack.pack(self.WORDS))
+        url = reverse('transcription-segments', args=[transcription.pk])
+
+        without_words = self.client.get(url).json()['results'][0]
+        self.assertNotIn('words', without_words)
+        with_words = self.client.get(url, {'include': 'words'}).json()['results'][0]
+        self.assertEqual([word['word'] for word in with_words['words']], ['Hello', 'wörld', '!'])
+        self.assertEqual(with_words['words'][0]['start'], 5.0)
+
+
+class NumpyAudioTests(TestCase):
+    """Decoding and resampling without torch, as used with the fake backends."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+    def test_stereo_file_is_downmixed_and_resampled(self):
+        import numpy as np
+        import soundfile
+
+        from . import audio
+
+        rate = 44100
+        t = np.arange(rate) / rate
+        tone = 0.5 * np.sin(2 * np.pi * 440 * t)
+        path = os.path.join(self.tmp, 'tone.wav')
+        soundfile.write(path, np.stack([tone, tone], axis=1), rate)
+
+        with mock.patch.object(audio, 'torch_available', return_value=False):
+            waveform = audio.load_normalized(path)
+
+        self.assertIsInstance(waveform, np.ndarray)
+        self.assertEqual(waveform.shape, (1, audio.SAMPLE_RATE))
+        self.assertEqual(waveform.dtype, np.float32)
+        spectrum = np.abs(np.fft.rfft(waveform[0]))
+        self.assertEqual(int(np.argmax(spectrum)), 440)
+
+    def test_chunks_match_single_pass(self):
+        import numpy as np
+
+        from . import audio
+
+        waveform = np.random.default_rng(0).standard_normal((2, 22050)).astype(np.float32)
+        whole = audio._prepare_numpy(waveform, 22050)
+        chunked = audio._prepare_numpy(waveform, 22050, chunk_size=1000)
+        np.testing.assert_array_equal(whole, chunked)
+
+
+class BenchmarkPeakRssTests(TestCase):
+    def test_includes_sampled_worker_memory(self):
+        from .management.commands.benchmark import peak_rss_mb
+
+        own_peak = peak_rss_mb()
+        self.assertGreater(own_peak, 0)
+        # RSS sampled across the process and its live workers can exceed ru_maxrss
+        self.assertAlmostEqual(peak_rss_mb(int((own_peak + 100) * 1024 * 1024)), own_peak + 100, places=3)
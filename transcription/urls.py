@@ -1,9 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TranscriptionViewSet
+from .views import TranscriptionViewSet, TranscriptionBatchViewSet, EnrolledSpeakerViewSet
 
 router = DefaultRouter()
 router.register(r'transcriptions', TranscriptionViewSet)
+router.register(r'batches', TranscriptionBatchViewSet)
+router.register(r'speakers', EnrolledSpeakerViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,40 +1,125 @@
 from django.shortcuts import render
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.core.files.storage import default_storage
 from django.conf import settings
 import threading
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 import logging
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
+from django.http import FileResponse, StreamingHttpResponse
 from django.core.exceptions import ValidationError
+from django.db import transaction as db_transaction
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import parse_etags
+from rest_framework.exceptions import ParseError
+import os
 import time
+import datetime
 import traceback
+import zipfile
 
-from .models import Transcription, TranscriptionSegment
+from .models import (
+    Transcription, TranscriptionBatch, TranscriptionSegment, EnrolledSpeaker, SpeakerEmbedding,
+    compute_content_hash
+)
 from .serializers import (
     TranscriptionSerializer,
+    TranscriptionListSerializer,
     TranscriptionCreateSerializer,
-    TranscriptionSegmentSerializer
+    TranscriptionBatchSerializer,
+    EnrolledSpeakerSerializer
 )
 from .services import TranscriptionService
+from .queries import TranscriptQueryService, SEGMENT_FIELDS
+from .pagination import SegmentCursorPagination, TranscriptionPagination
+from .jobs import transcription_worker
+from .exporters import EXPORTERS, buffered
+from .search import SegmentSearch
+from . import speakers, wordpack
+from .control import JobStopped
+from audio_blog_project.profiling import profile_requested
 
 logger = logging.getLogger(__name__)
 
 # Create your views here.
 
+def validate_audio_upload(name, size):
+    """Return an error message if an uploaded audio file is not acceptable, else None."""
+    if size > settings.MAX_AUDIO_SIZE:
+        return f"{name}: file size exceeds maximum allowed size of {settings.MAX_AUDIO_SIZE / (1024*1024)}MB"
+    ext = name.split('.')[-1].lower()
+    if ext not in settings.ALLOWED_AUDIO_EXTENSIONS:
+        return f"{name}: invalid file extension. Allowed extensions: {', '.join(settings.ALLOWED_AUDIO_EXTENSIONS)}"
+    return None
+
+def parse_date_param(value, name):
+    """Parse an ISO date or datetime query parameter, raising a 400 if it is malformed."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is not None:
+            parsed = datetime.datetime.combine(day, datetime.time.min)
+    if parsed is None:
+        raise ParseError(f"{name} must be an ISO 8601 date or datetime")
+    if settings.USE_TZ and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
 class TranscriptionViewSet(viewsets.ModelViewSet):
-    queryset = Transcription.objects.all()
+    queryset = Transcription.objects.all().order_by('-created_at', '-id')
     serializer_class = TranscriptionSerializer
     permission_classes = [AllowAny]  # For testing, we'll allow any access
+    pagination_class = TranscriptionPagination
+
+    def include_segments(self):
+        """Segments are nested on the detail view, or on the list with ?include=segments."""
+        if self.action == 'retrieve':
+            return True
+        include = self.request.query_params.get('include', '')
+        return 'segments' in include.split(',')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+
+        status_filter = self.request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status__in=status_filter.split(','))
+        created_after = self.request.query_params.get('created_after')
+        if created_after:
+            queryset = queryset.filter(created_at__gte=parse_date_param(created_after, 'created_after'))
+        created_before = self.request.query_params.get('created_before')
+        if created_before:
+            queryset = queryset.filter(created_at__lt=parse_date_param(created_before, 'created_before'))
+
+        if self.include_segments():
+            # Segments are loaded for the whole page in get_serializer
+            return queryset
+        return queryset.annotate(segment_count=Count('segments'))
+
+    def get_serializer(self, *args, **kwargs):
+        if args and self.include_segments():
+            instances = args[0] if kwargs.get('many') else [args[0]]
+            context = kwargs.setdefault('context', self.get_serializer_context())
+            context['segment_payloads'] = TranscriptQueryService().segments_by_transcription(
+                [transcription.pk for transcription in instances]
+            )
+        return super().get_serializer(*args, **kwargs)
 
     def get_serializer_class(self):
         if self.action == 'create':
             return TranscriptionCreateSerializer
+        if self.action == 'list' and not self.include_segments():
+            return TranscriptionListSerializer
         return TranscriptionSerializer
 
     def create(self, request, *args, **kwargs):
+        profile = profile_requested(request)
         try:
             start_time = time.time()
             audio_file = request.FILES.get('audio_file')
@@ -65,7 +150,8 @@ class TranscriptionViewSet(viewsets.ModelViewSet):
             transcription = Transcription.objects.create(
                 audio_file=audio_file,
                 status='pending',
-                language=language or 'auto'  # Use provided language or auto-detect
+                language=language or 'auto',  # Use provided language or auto-detect
+                content_hash=compute_content_hash(audio_file)
             )
 
             try:
@@ -74,14 +160,22 @@ class TranscriptionViewSet(viewsets.ModelViewSet):
                 service.transcribe_audio(
                     audio_path=transcription.audio_file.path,
                     transcription_id=transcription.id,
-                    language=language  # Pass language to service
+                    language=language,  # Pass language to service
+                    profile=profile
                 )
                 
                 # Get the formatted transcription in JSON format
-                result = service.get_transcription_text(transcription.id, format='json')
+                result = TranscriptQueryService().get_transcription_text(transcription.id, format='json')
                 
                 return Response(result)
 
+            except JobStopped as e:
+                return Response({
+                    "error": f"Transcription {e.status.replace('_', ' ')}",
+                    "details": str(e),
+                    "transcription_id": transcription.id
+                }, status=status.HTTP_409_CONFLICT)
+
             except Exception as e:
                 transcription.status = 'failed'
                 transcription.error_message = str(e)
@@ -101,51 +195,376 @@ class TranscriptionViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def status(self, request, pk=None):
         transcription = self.get_object()
+        return Response(TranscriptQueryService().get_status(transcription))
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a pending or running transcription.
+
+        A pending job is cancelled at once. A running job is flagged and stops
+        at its next checkpoint between speaker turns; poll the status action
+        until it reads 'cancelled'.
+        """
+        transcription = self.get_object()
+        if transcription.status == 'pending':
+            # The flag also stops a worker that claims the job at the same moment
+            cancelled = Transcription.objects.filter(pk=transcription.pk, status='pending').update(
+                status='cancelled',
+                cancel_requested=True,
+                error_message="Cancelled before processing started",
+                updated_at=timezone.now()
+            )
+            if cancelled:
+                return Response({"id": transcription.id, "status": 'cancelled'})
+            transcription.refresh_from_db()
+
+        if transcription.status == 'processing':
+            Transcription.objects.filter(pk=transcription.pk).update(cancel_requested=True)
+            return Response({
+                "id": transcription.id,
+                "status": transcription.status,
+                "cancel_requested": True
+            }, status=status.HTTP_202_ACCEPTED)
+
+        return Response(
+            {"error": f"Transcription is already {transcription.status}"},
+            status=status.HTTP_409_CONFLICT
+        )
+
+    @action(detail=True, methods=['post'])
+    def reprocess(self, request, pk=None):
+        """Run a transcription again in the background from its original or archived audio."""
+        transcription = self.get_object()
+        if transcription.status in ('pending', 'processing'):
+            return Response(
+                {"error": f"Transcription is already {transcription.status}"},
+                status=status.HTTP_409_CONFLICT
+            )
+        if not transcription.audio_path and not transcription.normalized_audio:
+            return Response(
+                {"error": "The audio of this transcription has been deleted"},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        language = request.data.get('language')
+        with db_transaction.atomic():
+            transcription.segments.all().delete()
+            transcription.speaker_embeddings.all().delete()
+            transcription.status = 'pending'
+            transcription.progress = 0.0
+            transcription.cancel_requested = False
+            transcription.error_message = None
+            if language:
+                transcription.language = language
+            transcription.save(update_fields=[
+                'status', 'progress', 'cancel_requested', 'error_message', 'language', 'updated_at'
+            ])
+            # One bump for the whole segment delete
+            Transcription.bump_version(transcription.pk)
+        transcription_worker.submit([transcription.id])
+
         return Response({
             "id": transcription.id,
             "status": transcription.status,
-            "duration": transcription.duration,
-            "num_speakers": transcription.num_speakers,
-            "language": transcription.language,
-            "created_at": transcription.created_at,
-            "updated_at": transcription.updated_at,
-            "error_message": transcription.error_message
+            "audio_storage": transcription.audio_storage
+        }, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['post'])
+    def enroll(self, request, pk=None):
+        """Enroll one speaker of this transcription as a known person.
+
+        Body: `speaker` (e.g. SPEAKER_01) and `name`. The speaker's segments
+        are labeled with the name, and later recordings of the same voice are
+        labeled automatically.
+        """
+        transcription = self.get_object()
+        speaker = request.data.get('speaker')
+        name = (request.data.get('name') or '').strip()
+        if not speaker or not name:
+            return Response(
+                {"error": "Both speaker and name are required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            enrolled = speakers.enroll(transcription, speaker, name)
+        except SpeakerEmbedding.DoesNotExist:
+            return Response(
+                {"error": f"No voice embedding stored for {speaker} in this transcription"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+
+        return Response({
+            **EnrolledSpeakerSerializer(enrolled).data,
+            "transcription_id": transcription.id,
+            "speaker": speaker
+        })
+
+    @action(detail=True, methods=['post'])
+    def identify(self, request, pk=None):
+        """Match this transcription's speakers against the enrolled speakers again."""
+        transcription = self.get_object()
+        return Response({
+            "transcription_id": transcription.id,
+            "matches": speakers.identify(transcription)
         })
 
+    @action(detail=True, methods=['get'], permission_classes=[IsAdminUser])
+    def profile(self, request, pk=None):
+        """Download the profiler artifacts recorded for this transcription (admin only)."""
+        transcription = self.get_object()
+        if not transcription.profile_artifact:
+            return Response(
+                {"error": "No profile recorded for this transcription"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return FileResponse(
+            transcription.profile_artifact.open('rb'),
+            as_attachment=True,
+            filename=os.path.basename(transcription.profile_artifact.name)
+        )
+
     @action(detail=True, methods=['get'])
     def text(self, request, pk=None):
+        """Rendered transcript as text or JSON.
+
+        Completed transcripts are cached per version and served with an ETag;
+        a matching If-None-Match gets a 304 without reading any segments.
+        """
         try:
             transcription = self.get_object()
-            service = TranscriptionService()
             format = request.query_params.get('format', 'text')
             
             if format not in ['text', 'json']:
                 return Response({
                     "error": "Invalid format. Supported formats: text, json"
                 }, status=status.HTTP_400_BAD_REQUEST)
-            
-            result = service.get_transcription_text(transcription.id, format=format)
-            
-            if format == 'json':
-                return Response(result)
-            else:
-                return Response({
-                    "transcription_id": transcription.id,
-                    "status": transcription.status,
-                    "text": result,
-                    "duration": transcription.duration,
-                    "num_speakers": transcription.num_speakers,
-                    "language": transcription.language
-                })
+
+            cacheable = transcription.status == 'completed'
+            etag = transcription.etag(format)
+            # Compressed responses carry the weak form of the ETag
+            client_etags = [tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))]
+            if cacheable and etag in client_etags:
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+            body = TranscriptQueryService().render(transcription, format)
+
+            if not cacheable:
+                return Response(body)
+            return Response(body, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
         except Exception as e:
             return Response({
                 "error": "Failed to get transcription text",
                 "details": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=True, methods=['get'], url_path=r'export/(?P<export_format>srt|vtt|rttm|txt)')
+    def export(self, request, pk=None, export_format=None):
+        """Stream the transcript as SRT, WebVTT, RTTM or plain text."""
+        transcription = self.get_object()
+        if transcription.status != 'completed':
+            return Response(
+                {"error": f"Transcription is {transcription.status}, only completed transcriptions can be exported"},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        generate, content_type, extension = EXPORTERS[export_format]
+        response = StreamingHttpResponse(buffered(generate(transcription)), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="transcription_{transcription.id}.{extension}"'
+        response['ETag'] = transcription.etag(export_format)
+        return response
+
     @action(detail=True, methods=['get'])
     def segments(self, request, pk=None):
+        """Cursor-paginated segments in time order.
+
+        Optional filters: `start` and `end` (seconds) return the segments that
+        overlap that window, `speaker` limits to one speaker. Page size is set
+        with `page_size`; follow the `next` link for the following page.
+        With `include=words` each segment also lists its word timings.
+        """
         transcription = self.get_object()
-        segments = transcription.segments.all()
-        serializer = TranscriptionSegmentSerializer(segments, many=True)
-        return Response(serializer.data)
+        try:
+            segments = TranscriptQueryService().filter_segments(
+                transcription,
+                start=request.query_params.get('start'),
+                end=request.query_params.get('end'),
+                speaker=request.query_params.get('speaker')
+            )
+        except ValueError:
+            return Response(
+                {"error": "start and end must be numbers of seconds"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        include_words = 'words' in request.query_params.get('include', '').split(',')
+        fields = SEGMENT_FIELDS + ('words',) if include_words else SEGMENT_FIELDS
+
+        # Paginate plain rows; the cursor reads start_time from the dicts
+        paginator = SegmentCursorPagination()
+        page = paginator.paginate_queryset(segments.values(*fields), request, view=self)
+        if include_words:
+            # Word blobs are only read and decoded for the requested page
+            for row in page:
+                row['words'] = wordpack.unpack(row['words'], row['start_time'])
+        return paginator.get_paginated_response(page)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Full-text search over segment text, best matches first.
+
+        `q` holds the search terms (all must match, `term*` matches a prefix);
+        `transcription` optionally limits the search to one transcription.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {"error": "Missing search query 'q'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        transcription_id = request.query_params.get('transcription')
+        if transcription_id is not None and not transcription_id.isdigit():
+            return Response(
+                {"error": "transcription must be an integer id"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = SegmentSearch(query, transcription_id=int(transcription_id) if transcription_id else None)
+        page = self.paginate_queryset(results)
+        return self.get_paginated_response(page)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Submit many audio files, or a zip archive of them, as one batch.
+
+        Files are uploaded as repeated `audio_files` fields and/or a single
+        `archive` zip. All transcriptions are created in one bulk insert and
+        queued together for background processing.
+        """
+        try:
+            uploads = request.FILES.getlist('audio_files')
+            archive = request.FILES.get('archive')
+            language = request.data.get('language')
+
+            if not uploads and not archive:
+                return Response(
+                    {"error": "No audio files provided. Use 'audio_files' and/or 'archive'"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            zip_file = None
+            if archive:
+                if not zipfile.is_zipfile(archive):
+                    return Response(
+                        {"error": "Archive must be a zip file"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                archive.seek(0)
+                zip_file = zipfile.ZipFile(archive)
+
+            try:
+                # Validate everything up front so a bad file does not leave a partial batch behind
+                entries = [(upload.name, upload) for upload in uploads]
+                if zip_file:
+                    entries += [
+                        (os.path.basename(info.filename), info)
+                        for info in zip_file.infolist()
+                        if not info.is_dir() and not os.path.basename(info.filename).startswith('.')
+                    ]
+
+                if not entries:
+                    return Response(
+                        {"error": "No audio files found in request"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                if len(entries) > settings.MAX_BATCH_FILES:
+                    return Response(
+                        {"error": f"Too many files. Maximum per batch is {settings.MAX_BATCH_FILES}"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+                errors = [
+                    error for error in (
+                        validate_audio_upload(
+                            name,
+                            entry.file_size if isinstance(entry, zipfile.ZipInfo) else entry.size
+                        )
+                        for name, entry in entries
+                    )
+                    if error
+                ]
+                if errors:
+                    return Response(
+                        {"error": "Invalid files in batch", "details": errors},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+                batch = TranscriptionBatch.objects.create(
+                    language=language or 'auto',
+                    total_files=len(entries)
+                )
+
+                # Store the files first, then create every row in one query
+                audio_field = Transcription._meta.get_field('audio_file')
+                transcriptions = []
+                for name, entry in entries:
+                    if isinstance(entry, zipfile.ZipInfo):
+                        with zip_file.open(entry) as member:
+                            stored_name = default_storage.save(
+                                audio_field.generate_filename(None, name), File(member, name=name)
+                            )
+                    else:
+                        stored_name = default_storage.save(
+                            audio_field.generate_filename(None, name), entry
+                        )
+                    transcriptions.append(Transcription(
+                        audio_file=stored_name,
+                        status='pending',
+                        language=language or 'auto',
+                        batch=batch,
+                        content_hash=compute_content_hash(default_storage.path(stored_name))
+                    ))
+            finally:
+                if zip_file:
+                    zip_file.close()
+
+            with db_transaction.atomic():
+                created = Transcription.objects.bulk_create(transcriptions)
+
+            transcription_worker.submit([t.id for t in created])
+            logger.info(f"Batch {batch.id} created with {len(created)} transcriptions")
+
+            return Response(
+                TranscriptionBatchSerializer(batch).data,
+                status=status.HTTP_202_ACCEPTED
+            )
+
+        except Exception as e:
+            logger.error(f"Batch submission failed: {str(e)}\n{traceback.format_exc()}")
+            return Response({
+                "error": "Batch request failed",
+                "details": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class TranscriptionBatchViewSet(viewsets.ReadOnlyModelViewSet):
+    """Read-only access to batches with a per-status summary of their transcriptions."""
+    queryset = TranscriptionBatch.objects.all().order_by('-created_at')
+    serializer_class = TranscriptionBatchSerializer
+    permission_classes = [AllowAny]
+
+
+class EnrolledSpeakerViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                             mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """Known speakers used to label new recordings. Enroll through the transcription enroll action."""
+    queryset = EnrolledSpeaker.objects.all()
+    serializer_class = EnrolledSpeakerSerializer
+    permission_classes = [AllowAny]
+
+    def perform_destroy(self, instance):
+        speaker_id = instance.pk
+        instance.delete()
+        speakers.speaker_index.remove(speaker_id)
@@ -0,0 +1,112 @@
+"""Compact binary storage for word-level timestamps.
+
+Word timings for a segment are stored in TranscriptionSegment.words as one
+blob instead of a row per word:
+
+    header         magic b'WP', format version (uint8), word count (uint32)
+    offsets        uint32[n]  word start, milliseconds after the segment start
+    durations      uint16[n]  word length in milliseconds
+    probabilities  uint8[n]   word probability scaled to 0-255
+    lengths        uint16[n]  UTF-8 byte length of each word
+    text           the words' UTF-8 bytes, concatenated
+
+All integers are little-endian. A 20-word segment takes about 250 bytes.
+"""
+import struct
+
+import numpy as np
+
+MAGIC = b'WP'
+VERSION = 1
+HEADER = struct.Struct('<2sBI')
+
+OFFSET_DTYPE = np.dtype('<u4')
+DURATION_DTYPE = np.dtype('<u2')
+PROBABILITY_DTYPE = np.dtype('u1')
+LENGTH_DTYPE = np.dtype('<u2')
+
+
+def pack(words):
+    """Pack words into a blob, or return None when there are none.
+
+    Args:
+        words: Iterable of dicts with 'word', 'start' and 'end' in seconds
+            from the start of the segment, and an optional 'probability'
+
+    Returns:
+        bytes
+    """
+    words = list(words or [])
+    if not words:
+        return None
+
+    starts = np.array([max(word['start'], 0.0) for word in words], dtype=np.float64)
+    ends = np.array([max(word['end'], word['start'], 0.0) for word in words], dtype=np.float64)
+    probabilities = np.array([word.get('probability', 1.0) for word in words], dtype=np.float64)
+    encoded = [word['word'].encode('utf-8')[:np.iinfo(LENGTH_DTYPE).max] for word in words]
+
+    offsets = np.round(starts * 1000).astype(OFFSET_DTYPE)
+    durations = np.clip(np.round((ends - starts) * 1000), 0, np.iinfo(DURATION_DTYPE).max).astype(DURATION_DTYPE)
+    scaled = np.clip(np.round(probabilities * 255), 0, 255).astype(PROBABILITY_DTYPE)
+    lengths = np.array([len(word) for word in encoded], dtype=LENGTH_DTYPE)
+
+    return b''.join([
+        HEADER.pack(MAGIC, VERSION, len(words)),
+        offsets.tobytes(),
+        durations.tobytes(),
+        scaled.tobytes(),
+        lengths.tobytes(),
+        b''.join(encoded),
+    ])
+
+
+def _arrays(blob):
+    magic, version, count = HEADER.unpack_from(blob)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a version {VERSION} word blob")
+
+    position = HEADER.size
+    arrays = []
+    for dtype in (OFFSET_DTYPE, DURATION_DTYPE, PROBABILITY_DTYPE, LENGTH_DTYPE):
+        arrays.append(np.frombuffer(blob, dtype=dtype, count=count, offset=position))
+        position += dtype.itemsize * count
+    return arrays, position
+
+
+def count(blob):
+    """Number of words in a blob, read from the header only."""
+    if not blob:
+        return 0
+    return HEADER.unpack_from(blob)[2]
+
+
+def unpack(blob, segment_start=0.0):
+    """Decode a blob into word dicts with absolute 'start' and 'end' times in seconds.
+
+    Args:
+        blob: Bytes (or memoryview) produced by pack(), or None
+        segment_start: Start time of the segment, added to every word offset
+
+    Returns:
+        list: Dicts with 'word', 'start', 'end' and 'probability'
+    """
+    if not blob:
+        return []
+
+    (offsets, durations, probabilities, lengths), position = _arrays(blob)
+    text = bytes(blob[position:])
+
+    words = []
+    cursor = 0
+    for offset, duration, probability, length in zip(
+        offsets.tolist(), durations.tolist(), probabilities.tolist(), lengths.tolist()
+    ):
+        start = segment_start + offset / 1000.0
+        words.append({
+            'word': text[cursor:cursor + length].decode('utf-8'),
+            'start': round(start, 3),
+            'end': round(start + duration / 1000.0, 3),
+            'probability': round(probability / 255.0, 3),
+        })
+        cursor += length
+    return words
@@ -0,0 +1,138 @@
+import time
+import queue
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class _FlushMarker:
+    def __init__(self):
+        self.event = threading.Event()
+        self.error = None
+
+
+class BatchedWriter:
+    """Single background thread that applies database writes in batches.
+
+    SQLite allows one writer at a time, so workers hand their frequent
+    writes (segment rows, progress and status updates) to this thread instead
+    of each opening its own write transaction. Writes queued within
+    settings.WRITER_FLUSH_INTERVAL are applied together in one transaction:
+    creates first, then updates, with repeated updates of the same row
+    merged. Call flush() to wait until everything queued so far is written.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def create(self, objects):
+        """Queue unsaved model instances for bulk_create."""
+        if objects:
+            self._put(('create', list(objects)))
+
+    def update(self, model, pk, **fields):
+        """Queue a field update of one row; later updates of the same row win."""
+        self._put(('update', (model, pk, fields)))
+
+    def flush(self, timeout=None):
+        """Block until all writes queued so far are committed.
+
+        Raises the database error if any of those writes failed.
+        """
+        marker = _FlushMarker()
+        self._put(('flush', marker))
+        timeout = settings.WRITER_FLUSH_TIMEOUT if timeout is None else timeout
+        if not marker.event.wait(timeout):
+            raise Exception(f"Timed out after {timeout}s waiting for database writes")
+        if marker.error is not None:
+            raise marker.error
+
+    def _put(self, op):
+        self._queue.put(op)
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            ops = [self._queue.get()]
+            rows = 0
+            deadline = time.monotonic() + settings.WRITER_FLUSH_INTERVAL
+            # Collect more work until the batch is full, the interval passes or someone waits on it
+            while ops[-1][0] != 'flush' and rows < settings.WRITER_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    op = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                ops.append(op)
+                if op[0] == 'create':
+                    rows += len(op[1])
+
+            try:
+                self._write(ops)
+            except Exception as e:
+                logger.error(f"Database writer failed: {str(e)}")
+            finally:
+                close_old_connections()
+
+    def _write(self, ops):
+        markers = [payload for kind, payload in ops if kind == 'flush']
+        writes = [op for op in ops if op[0] != 'flush']
+        error = None
+        try:
+            self._apply(writes)
+        except Exception as e:
+            # Retry one by one so a single bad write does not drop the rest of the batch
+            logger.error(f"Batched write of {len(writes)} operations failed, retrying individually: {str(e)}")
+            for op in writes:
+                try:
+                    self._apply([op])
+                except Exception as op_error:
+                    logger.error(f"Database write failed: {str(op_error)}")
+                    error = error or op_error
+        for marker in markers:
+            marker.error = error
+            marker.event.set()
+
+    def _apply(self, writes):
+        creates = defaultdict(list)
+        updates = {}
+        for kind, payload in writes:
+            if kind == 'create':
+                for obj in payload:
+                    creates[type(obj)].append(obj)
+            else:
+                model, pk, fields = payload
+                updates.setdefault((model, pk), {}).update(fields)
+
+        if not creates and not updates:
+            return
+        with transaction.atomic():
+            for model, objects in creates.items():
+                model.objects.bulk_create(objects, batch_size=500)
+            for (model, pk), fields in updates.items():
+                model.objects.filter(pk=pk).update(**fields)
+
+
+db_writer = BatchedWriter()
+
+
+@atexit.register
+def _flush_on_exit():
+    if db_writer._thread is not None and db_writer._thread.is_alive():
+        try:
+            db_writer.flush(timeout=10)
+        except Exception as e:
+            logger.error(f"Pending database writes lost at exit: {str(e)}")